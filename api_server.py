@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP JSON API поверх bot_core — те же ответы, что даёт Телеграм-бот, для сайта приёмной комиссии.
+
+GET  /api/programs
+GET  /api/{pid}/mandatory?semester=1
+GET  /api/{pid}/selective?semester=2
+GET  /api/{pid}/practice | /gia | /soft
+GET  /api/{pid}/search?q=глубокое
+GET  /api/{pid}/recommend?tags=ml,nlp&semester=2&k=6
+GET  /api/{pid}/plan?tags=ml,nlp
+GET  /api/similar?q=глубокое обучение&k=5
+GET  /api/compare?tags=ml,nlp
+POST /api/ask   {"session": "abc", "text": "рекомендации 2 семестр", "program": "ai", "tags": ["ml"]}
+
+GET-ответы зависят только от URL и версии учебных планов, поэтому кэшируются в памяти
+и отдаются с ETag (хэш содержимого планов + URL): повторный запрос с If-None-Match получает 304.
+
+Быстрый запуск:
+  python api_server.py --port 8080 --workers 4
+
+/api/ask держит сессии в памяти процесса — при --workers > 1 балансировщик должен
+направлять одну сессию в один процесс (или используйте --workers 1 для диалога).
+"""
+
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing as mp
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+import bot_core as core
+from usage_log import log as usage, log_answer
+
+CACHE_SIZE = 4096     # ответов в LRU-кэше
+SESSIONS_MAX = 10000  # сессий /api/ask в памяти
+KEEPALIVE = 75        # секунд держим keep-alive соединение
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# ---------- Параметры ----------
+
+def _program(request: web.Request) -> str:
+    pid = request.match_info["pid"]
+    if pid not in core.PLAN_PATHS:
+        raise ApiError(404, f"unknown program: {pid}")
+    return pid
+
+def _int(request: web.Request, name: str, default: Optional[int] = None) -> Optional[int]:
+    raw = request.query.get(name)
+    if raw is None or raw == "":
+        return default
+    val = core._safe_int(raw)
+    if val is None:
+        raise ApiError(400, f"{name} must be an integer")
+    return val
+
+def _tags(raw: Any) -> List[str]:
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, list) or not all(isinstance(t, str) for t in raw):
+        raise ApiError(400, "tags must be a string or a list of strings")
+    return [t.strip().lower() for t in raw if t.strip()]
+
+def _k(request: web.Request, default: int) -> int:
+    k = _int(request, "k", default)
+    if k < 1:
+        raise ApiError(400, "k must be positive")
+    return k
+
+def _semester(request: web.Request) -> int:
+    sem = _int(request, "semester")
+    if not sem:
+        raise ApiError(400, "semester is required")
+    return sem
+
+# ---------- Обработчики (синхронные, чистые: URL -> JSON) ----------
+
+def programs(request: web.Request) -> Any:
+    return [{"id": pid, "title": title} for pid, title in core.store.list_programs()]
+
+def mandatory(request: web.Request) -> Any:
+    pid, sem = _program(request), _semester(request)
+    if pid == "ai":
+        return core.get_mandatory_courses_ai(sem)
+    # как в BotSession.handle: у AI Product обязательные — все курсы семестра из секций
+    return [r for r in core.search_courses(pid, "") if r.get("semester") == sem]
+
+def selective(request: web.Request) -> Any:
+    pid, sem = _program(request), _semester(request)
+    if pid == "ai":
+        return core.get_selective_courses_ai(sem)
+    return [r for r in core.search_courses(pid, "") if r.get("semester") == sem]
+
+def practice(request: web.Request) -> Any:
+    return core.get_practice(_program(request))
+
+def gia(request: web.Request) -> Any:
+    return core.get_gia(_program(request))
+
+def soft(request: web.Request) -> Any:
+    return core.get_soft_skills(_program(request))
+
+def search(request: web.Request) -> Any:
+    pid = _program(request)
+    q = request.query.get("q", "").strip()
+    if not q:
+        raise ApiError(400, "q is required")
+    return core.search_courses(pid, q)
+
+def recommend(request: web.Request) -> Any:
+    pid = _program(request)
+    tags = _tags(request.query.get("tags", ""))
+    if not tags:
+        raise ApiError(400, "tags is required")
+    return core.recommend_electives(pid, tags, semester=_int(request, "semester"), top_k=_k(request, 6))
+
+def plan(request: web.Request) -> Any:
+    pid = _program(request)
+    tags = _tags(request.query.get("tags", ""))
+    if not tags:
+        raise ApiError(400, "tags is required")
+    return core.build_study_plan(pid, tags)
+
+def similar(request: web.Request) -> Any:
+    q = request.query.get("q", "").strip()
+    if not q:
+        raise ApiError(400, "q is required")
+    anchor, rows = core.similar_courses(q, k=_k(request, 5), pid=request.query.get("program"))
+    return {"course": anchor, "similar": rows}
+
+def compare(request: web.Request) -> Any:
+    tags = _tags(request.query.get("tags", ""))
+    if not tags:
+        raise ApiError(400, "tags is required")
+    return core.rank_programs(tags)
+
+# ---------- Кэш и ETag ----------
+
+class ResponseCache:
+    """LRU: (версия store, путь+query) -> (тело, etag). Смена версии делает старые ключи недостижимыми."""
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.items: "OrderedDict[Tuple[int, str], Tuple[bytes, str]]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key: Tuple[int, str]) -> Optional[Tuple[bytes, str]]:
+        hit = self.items.get(key)
+        if hit is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return hit
+
+    def put(self, key: Tuple[int, str], value: Tuple[bytes, str]):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _etag(body: bytes) -> str:
+    # хэш самого ответа, а не счётчик перезагрузок store: после обновления планов
+    # (или формата ответа) и рестарта тот же URL получает новый ETag, а не 304 со старыми данными
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+def _json(body: bytes, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    return web.Response(body=body, status=status, content_type="application/json", charset="utf-8", headers=headers)
+
+def cached(fn: Callable[[web.Request], Any]):
+    async def handler(request: web.Request) -> web.Response:
+        cache: ResponseCache = request.app["cache"]
+        key = (core.store.version, request.rel_url.path_qs)
+        hit = cache.get(key)
+        if hit is None:
+            try:
+                body = _dumps(fn(request))
+            except ApiError as e:
+                return _json(_dumps({"error": str(e)}), status=e.status)
+            hit = (body, _etag(body))
+            cache.put(key, hit)
+        body, etag = hit
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return _json(body, headers=headers)
+    return handler
+
+# ---------- Диалог ----------
+
+def _ask_fields(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[List[str]], str]:
+    program = payload.get("program")
+    if program not in (None, "") and (not isinstance(program, str) or program not in core.PLAN_PATHS):
+        raise ApiError(400, f"program must be one of: {', '.join(core.PLAN_PATHS)}")
+    tags = _tags(payload["tags"]) if payload.get("tags") is not None else None
+    text = payload.get("text")
+    if text is not None and not isinstance(text, str):
+        raise ApiError(400, "text must be a string")
+    return program, tags, text or ""
+
+async def ask(request: web.Request) -> web.Response:
+    try:
+        payload = await request.json()
+    except ValueError:
+        return _json(_dumps({"error": "body must be JSON"}), status=400)
+    if not isinstance(payload, dict):
+        return _json(_dumps({"error": "body must be a JSON object"}), status=400)
+    try:
+        program, tags, text = _ask_fields(payload)
+    except ApiError as e:
+        return _json(_dumps({"error": str(e)}), status=e.status)
+    sessions: "OrderedDict[str, core.BotSession]" = request.app["sessions"]
+    sid = str(payload.get("session") or "")
+    s = sessions.get(sid) if sid else None
+    if s is None:
+        s = core.BotSession()
+        if sid:
+            sessions[sid] = s
+            while len(sessions) > SESSIONS_MAX:
+                sessions.popitem(last=False)
+    elif sid:
+        sessions.move_to_end(sid)
+    if program:
+        s.program = program
+    if tags is not None:
+        s.tags = tags[:12]
+    t0 = time.perf_counter()
+    answer = s.handle(text)
+    log_answer("api", sid, s, text, (time.perf_counter() - t0) * 1000)
+    return _json(_dumps({"answer": answer, "intent": s.last_intent, "program": s.program, "tags": s.tags}))
+
+async def healthz(request: web.Request) -> web.Response:
+    return _json(_dumps({"status": "alive"}))
+
+async def readyz(request: web.Request) -> web.Response:
+    if "warmup_ms" not in request.app:
+        return _json(_dumps({"status": "warming up"}), status=503)
+    return _json(_dumps({"status": "ready", "warmup_ms": request.app["warmup_ms"]}))
+
+async def _warmup(app: web.Application):
+    app["warmup_ms"] = core.warmup()
+    usage.start()
+
+async def _close_usage(app: web.Application):
+    usage.close()
+
+async def stats(request: web.Request) -> web.Response:
+    cache: ResponseCache = request.app["cache"]
+    return _json(_dumps({"store_version": core.store.version, "cache_items": len(cache.items),
+                         "cache_hits": cache.hits, "cache_misses": cache.misses,
+                         "sessions": len(request.app["sessions"]), "usage_log": usage.stats()}))
+
+# ---------- Приложение ----------
+
+def make_app() -> web.Application:
+    app = web.Application()
+    app["cache"] = ResponseCache()
+    app["sessions"] = OrderedDict()
+    app.add_routes([
+        web.get("/api/programs", cached(programs)),
+        web.get("/api/similar", cached(similar)),
+        web.get("/api/compare", cached(compare)),
+        web.get("/api/{pid}/mandatory", cached(mandatory)),
+        web.get("/api/{pid}/selective", cached(selective)),
+        web.get("/api/{pid}/practice", cached(practice)),
+        web.get("/api/{pid}/gia", cached(gia)),
+        web.get("/api/{pid}/soft", cached(soft)),
+        web.get("/api/{pid}/search", cached(search)),
+        web.get("/api/{pid}/recommend", cached(recommend)),
+        web.get("/api/{pid}/plan", cached(plan)),
+        web.post("/api/ask", ask),
+        web.get("/api/stats", stats),
+        web.get("/healthz", healthz),
+        web.get("/readyz", readyz),
+    ])
+    # on_startup отрабатывает до того, как сервер начнёт принимать соединения
+    app.on_startup.append(_warmup)
+    app.on_cleanup.append(_close_usage)
+    return app
+
+def serve(host: str, port: int, reuse_port: bool = False):
+    web.run_app(make_app(), host=host, port=port, keepalive_timeout=KEEPALIVE,
+                reuse_port=reuse_port, access_log=None, print=None)
+
+def main():
+    ap = argparse.ArgumentParser(description="HTTP JSON API бота")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Процессов на одном порту (SO_REUSEPORT); у каждого свой кэш и сессии /api/ask")
+    args = ap.parse_args()
+    print(f"API: http://{args.host}:{args.port}/api/programs, процессов: {args.workers}")
+    if args.workers <= 1:
+        serve(args.host, args.port)
+        return
+    procs = [mp.Process(target=serve, args=(args.host, args.port, True)) for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Пакетный прогон вопросов через BotSession.handle — офлайн-оценка интентов и ответов без Telegram.
+
+Вход: JSON Lines, по строке на вопрос:
+  {"user_id": 42, "text": "рекомендации 2 семестр", "program": "ai", "tags": ["ml", "nlp"]}
+program/tags необязательны — если заданы, применяются к сессии пользователя перед вопросом.
+
+Пользователи раскладываются по воркерам по хэшу user_id, поэтому сессия каждого
+живёт в одном процессе и его вопросы обрабатываются строго по порядку.
+Результаты пишутся потоково (JSONL), в конце в stderr — пропускная способность и тайминги по интентам.
+
+Быстрый запуск:
+  python batch_qa.py questions.jsonl --out answers.jsonl --workers 8
+  cat questions.jsonl | python batch_qa.py - > answers.jsonl
+"""
+
+import sys
+import json
+import time
+import zlib
+import argparse
+import threading
+import multiprocessing as mp
+from typing import Any, Dict, IO, List, Tuple
+
+from bot_core import PLAN_PATHS, BotSession, warmup
+
+BATCH = 256       # вопросов в одном сообщении воркеру
+QUEUE_DEPTH = 8   # батчей в очереди на воркер — ограничивает память при чтении огромного входа
+
+# ---------- Воркер ----------
+
+def _answer(sessions: Dict[str, Any], rec: Dict[str, Any]) -> Tuple[str, str]:
+    # ключ — строка, как и при раскладке по воркерам: user_id может прийти числом, строкой или списком
+    uid = str(rec.get("user_id", 0))
+    s = sessions.get(uid)
+    if s is None:
+        s = sessions[uid] = BotSession()
+    try:
+        if rec.get("program"):
+            if rec["program"] not in PLAN_PATHS:
+                raise ValueError(f"неизвестная программа {rec['program']!r}")
+            s.program = rec["program"]
+        if rec.get("tags") is not None:
+            tags = rec["tags"]
+            s.tags = [t.strip().lower() for t in (tags.split(",") if isinstance(tags, str) else tags) if t.strip()]
+        answer = s.handle(rec.get("text") or "")
+        intent = s.last_intent or "?"
+    except Exception as e:  # как в tg_bot.handle_message: ошибку отдаём ответом, прогон не роняем
+        answer, intent = f"ERROR: {e}", "error"
+    return intent, answer
+
+def _worker(inq: "mp.Queue", outq: "mp.Queue"):
+    sessions: Dict[str, Any] = {}
+    timings: Dict[str, List[float]] = {}
+    while True:
+        batch = inq.get()
+        if batch is None:
+            break
+        out = []
+        for seq, rec in batch:
+            t0 = time.perf_counter()
+            intent, answer = _answer(sessions, rec)
+            ms = (time.perf_counter() - t0) * 1000
+            timings.setdefault(intent, []).append(ms)
+            out.append({"seq": seq, "user_id": rec.get("user_id"), "intent": intent,
+                        "answer": answer, "ms": round(ms, 3)})
+        outq.put(("rows", out))
+    outq.put(("done", timings))
+
+# ---------- Ввод / вывод ----------
+
+def _records(src: IO[str]):
+    for n, line in enumerate(src, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            print(f"строка {n}: не JSON, пропускаю", file=sys.stderr)
+            continue
+        if isinstance(rec, str):
+            rec = {"text": rec}
+        elif not isinstance(rec, dict):
+            print(f"строка {n}: не объект, пропускаю", file=sys.stderr)
+            continue
+        yield rec
+
+def _writer(outq: "mp.Queue", dst: IO[str], workers: int, timings: Dict[str, List[float]], counter: List[int]):
+    done = 0
+    while done < workers:
+        kind, payload = outq.get()
+        if kind == "done":
+            done += 1
+            for intent, ms in payload.items():
+                timings.setdefault(intent, []).extend(ms)
+            continue
+        for row in payload:
+            dst.write(json.dumps(row, ensure_ascii=False) + "\n")
+        counter[0] += len(payload)
+    dst.flush()
+
+def _pct(xs: List[float], p: float) -> float:
+    return xs[min(len(xs) - 1, int(len(xs) * p))]
+
+def report(timings: Dict[str, List[float]], total: int, elapsed: float, out: IO[str] = sys.stderr):
+    print(f"\nВопросов: {total} за {elapsed:.2f} с — {total / elapsed if elapsed else 0:.0f} в секунду", file=out)
+    print(f"{'интент':<16}{'кол-во':>9}{'доля':>8}{'ср., мс':>10}{'p50':>9}{'p95':>9}{'max':>9}", file=out)
+    for intent, ms in sorted(timings.items(), key=lambda x: -len(x[1])):
+        ms.sort()
+        print(f"{intent:<16}{len(ms):>9}{len(ms) / max(total, 1):>8.1%}{sum(ms) / len(ms):>10.3f}"
+              f"{_pct(ms, 0.5):>9.3f}{_pct(ms, 0.95):>9.3f}{ms[-1]:>9.3f}", file=out)
+
+# ---------- CLI ----------
+
+def main():
+    ap = argparse.ArgumentParser(description="Пакетные ответы бота на вопросы из JSONL")
+    ap.add_argument("input", help="Файл JSONL или «-» для stdin")
+    ap.add_argument("--out", default="-", help="Куда писать ответы (JSONL), по умолчанию stdout")
+    ap.add_argument("--workers", type=int, default=mp.cpu_count(), help="Число процессов")
+    args = ap.parse_args()
+    workers = max(1, args.workers)
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+
+    # прогреваем до fork — воркеры наследуют готовые индексы и тайминги не включают холодный старт
+    warmup()
+    inqs = [mp.Queue(maxsize=QUEUE_DEPTH) for _ in range(workers)]
+    outq: "mp.Queue" = mp.Queue()
+    procs = [mp.Process(target=_worker, args=(q, outq), daemon=True) for q in inqs]
+    for p in procs:
+        p.start()
+
+    timings: Dict[str, List[float]] = {}
+    counter = [0]
+    writer = threading.Thread(target=_writer, args=(outq, dst, workers, timings, counter))
+    writer.start()
+
+    t0 = time.perf_counter()
+    pending: List[List[Tuple[int, Dict[str, Any]]]] = [[] for _ in range(workers)]
+    for seq, rec in enumerate(_records(src)):
+        w = zlib.crc32(str(rec.get("user_id", 0)).encode()) % workers
+        pending[w].append((seq, rec))
+        if len(pending[w]) >= BATCH:
+            inqs[w].put(pending[w])
+            pending[w] = []
+    for w, q in enumerate(inqs):
+        if pending[w]:
+            q.put(pending[w])
+        q.put(None)
+
+    writer.join()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+    if src is not sys.stdin:
+        src.close()
+    if dst is not sys.stdout:
+        dst.close()
+    report(timings, counter[0], elapsed)
+
+if __name__ == "__main__":
+    main()
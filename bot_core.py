@@ -1,9 +1,15 @@
 # bot_core.py
 from __future__ import annotations
+import heapq
 import json
+import math
 import re
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from curriculum import iter_records
 
 # --- безопасное разрешение путей ---
 def _resolve(p: str) -> Path:
@@ -23,14 +29,106 @@ AI_PRODUCT_PLAN_PATH = _resolve("data/ai_product_plan.json")
 
 ProgramId = str  # "ai" | "ai_product"
 
+PLAN_PATHS: Dict[ProgramId, Path] = {
+    "ai": AI_PLAN_PATH,
+    "ai_product": AI_PRODUCT_PLAN_PATH,
+}
+
 # -------------------- Хранилище учебных планов --------------------
 class CurriculumStore:
+    """
+    Планы читаются лениво — при первом обращении к db/records/meta/version,
+    поэтому `import bot_core` не трогает диск (быстрый старт CLI, тестов и воркеров).
+    """
     def __init__(self):
-        self.db: Dict[ProgramId, Dict[str, Any]] = {}
+        self._db: Dict[ProgramId, Dict[str, Any]] = {}
+        # плоский индекс в формате curriculum.jsonl: заголовок программы и её курсы
+        self._meta: Dict[ProgramId, Dict[str, Any]] = {}
+        self._records: Dict[ProgramId, List[Dict[str, Any]]] = {}
+        self._profiles: Optional[Dict[ProgramId, Dict[str, Any]]] = None
+        self._version = 0  # растёт при каждой (пере)загрузке — ключ для кэшей
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    @property
+    def db(self) -> Dict[ProgramId, Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._db
+
+    @property
+    def meta(self) -> Dict[ProgramId, Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._meta
+
+    @property
+    def records(self) -> Dict[ProgramId, List[Dict[str, Any]]]:
+        self._ensure_loaded()
+        return self._records
+
+    @property
+    def version(self) -> int:
+        self._ensure_loaded()
+        return self._version
 
     def load(self):
-        self.db["ai"] = json.loads(AI_PLAN_PATH.read_text(encoding="utf-8"))
-        self.db["ai_product"] = json.loads(AI_PRODUCT_PLAN_PATH.read_text(encoding="utf-8"))
+        self._loaded = True
+        self.reload(PLAN_PATHS)
+
+    def reload(self, pids: Iterable[ProgramId]):
+        """Перечитать только указанные программы (например, affected_programs из changelog)."""
+        if not self._loaded:
+            return self.load()
+        for pid in pids:
+            self._db[pid] = json.loads(PLAN_PATHS[pid].read_text(encoding="utf-8"))
+            head, *courses = iter_records(pid, self._db[pid])
+            self._meta[pid], self._records[pid] = head, courses
+        self._profiles = None
+        self._version += 1
+
+    def tag_profiles(self) -> Dict[ProgramId, Dict[str, Any]]:
+        """
+        Профиль покрытия тем для каждой программы: сколько кредитов курсов по каждой
+        теме TAG_TO_QUERY она предлагает, всего и по семестрам. Считается один раз
+        на загрузку (при первом обращении) и дальше берётся из памяти.
+        """
+        if self._profiles is None:
+            rx = {tag: re.compile(q, re.I) for tag, q in TAG_TO_QUERY.items()}
+            profiles: Dict[ProgramId, Dict[str, Any]] = {}
+            for pid, rows in self.records.items():
+                total: Dict[str, int] = {}
+                by_sem: Dict[str, Dict[int, int]] = {}
+                seen_total, seen_sem = set(), set()
+                for c in rows:
+                    if c["kind"] in PROFILE_SKIP_KINDS or not c.get("credits"):
+                        continue
+                    title = c["title"].lower()
+                    tags = [tag for tag, r in rx.items() if r.search(title)]
+                    if not tags:
+                        continue
+                    if title not in seen_total:
+                        seen_total.add(title)
+                        for tag in tags:
+                            total[tag] = total.get(tag, 0) + c["credits"]
+                    for sem in c["semesters"]:
+                        if (title, sem) in seen_sem:
+                            continue
+                        seen_sem.add((title, sem))
+                        for tag in tags:
+                            per = by_sem.setdefault(tag, {})
+                            per[sem] = per.get(sem, 0) + c["credits"]
+                norm = sum(v * v for v in total.values()) ** 0.5
+                profiles[pid] = {"credits": total, "by_semester": by_sem, "norm": norm}
+            self._profiles = profiles
+        return self._profiles
+
+    def courses(self, pid: Optional[ProgramId] = None) -> List[Dict[str, Any]]:
+        """Курсы одной программы или всех сразу — единый формат для обеих схем."""
+        if pid is not None:
+            return self.records.get(pid, [])
+        return [c for rows in self.records.values() for c in rows]
 
     def list_programs(self) -> List[Tuple[ProgramId, str]]:
         return [
@@ -38,8 +136,11 @@ class CurriculumStore:
             ("ai_product", self.db["ai_product"]["curriculum_name"]),
         ]
 
-store = CurriculumStore()
-store.load()
+# практика/ГИА/софт-скиллы/универсальный модуль (языки, мировоззрение) общие для всех
+# программ — в профиль тем не входят, иначе «Иностранный язык» попадает в nlp
+PROFILE_SKIP_KINDS = ("practice", "gia", "soft", "universal")
+
+store = CurriculumStore()  # загрузится при первом обращении
 
 # -------------------- Утилиты выборки --------------------
 def _safe_int(x) -> Optional[int]:
@@ -200,15 +301,19 @@ def _score_title(title: str, rx_list: List[re.Pattern]) -> int:
             score += 1
     return score
 
+@lru_cache(maxsize=4096)
+def _tag_pattern(tag: str) -> re.Pattern:
+    q = TAG_TO_QUERY.get(tag.lower())
+    if not q:
+        # если юзер дал свободный текст — тоже добавим
+        q = tag
+    try:
+        return re.compile(q, re.I)
+    except re.error:  # «c++» и т.п. в свободном тексте — ищем буквально
+        return re.compile(re.escape(q), re.I)
+
 def _compile_patterns(tags: List[str]) -> List[re.Pattern]:
-    pats: List[re.Pattern] = []
-    for tag in tags:
-        q = TAG_TO_QUERY.get(tag.lower())
-        if not q: 
-            # если юзер дал свободный текст — тоже добавим
-            q = tag
-        pats.append(re.compile(q, re.I))
-    return pats
+    return [_tag_pattern(tag) for tag in tags]
 
 def recommend_electives(pid: ProgramId, tags: List[str], semester: Optional[int] = None, top_k: int = 6) -> List[Dict[str, Any]]:
     """Очень простой скорер: собираем все выборные курсы и ранжируем по совпадениям с тегами."""
@@ -258,6 +363,313 @@ def recommend_electives(pid: ProgramId, tags: List[str], semester: Optional[int]
     scored.sort(key=lambda x: (-x[0], (x[1].get("semester") or 99), x[1]["title"]))
     return [c for _, c in scored[:top_k]]
 
+# -------------------- «Собери план»: выбор элективов под бюджет кредитов --------------------
+def _knapsack(items: List[Tuple[int, int]], budget: int) -> List[int]:
+    """
+    0/1-рюкзак по кредитам: items — (кредиты, ценность), возвращает индексы выбранных.
+    Сначала добираем кредиты как можно ближе к бюджету, при равенстве — максимум ценности.
+    """
+    best: List[Optional[int]] = [None] * (budget + 1)
+    best[0] = 0
+    take = [[False] * (budget + 1) for _ in items]
+    for i, (w, v) in enumerate(items):
+        for c in range(budget, w - 1, -1):
+            prev = best[c - w]
+            if prev is not None and (best[c] is None or prev + v > best[c]):
+                best[c] = prev + v
+                take[i][c] = True
+    c = max(x for x in range(budget + 1) if best[x] is not None)
+    chosen: List[int] = []
+    for i in range(len(items) - 1, -1, -1):
+        if take[i][c]:
+            chosen.append(i)
+            c -= items[i][0]
+    return chosen[::-1]
+
+def _selection_groups(pid: ProgramId) -> List[Dict[str, Any]]:
+    """Группы курсов семестра: (семестр, название группы) -> бюджет и курсы с нормализованными названиями."""
+    groups: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for c in store.courses(pid):
+        if c["kind"] not in ("mandatory", "elective") or len(c["semesters"]) != 1 or not c.get("credits"):
+            continue
+        key = (c["semesters"][0], c["group"] or "")
+        g = groups.setdefault(key, {"semester": key[0], "group": key[1], "budget": c["group_credits"],
+                                    "mandatory": True, "courses": []})
+        g["mandatory"] = g["mandatory"] and c["kind"] == "mandatory"
+        g["courses"].append((_norm_title(c["title"]), c))
+    out = [groups[k] for k in sorted(groups)]
+    for g in out:
+        g["total"] = sum(c["credits"] for _, c in g["courses"])
+    return out
+
+# группы считаются один раз на версию store
+_plan_cache: Dict[str, Any] = {"version": None, "groups": {}}
+
+def _plan_groups(pid: ProgramId) -> List[Dict[str, Any]]:
+    if _plan_cache["version"] != store.version:
+        _plan_cache.update(version=store.version, groups={})
+    if pid not in _plan_cache["groups"]:
+        _plan_cache["groups"][pid] = _selection_groups(pid)
+    return _plan_cache["groups"][pid]
+
+@lru_cache(maxsize=1024)
+def _plan_hits(pid: ProgramId, tag: str, version: int) -> frozenset:
+    """id курсов групп выбора, совпавших с тегом; теги — свободный текст из API, поэтому LRU."""
+    rx = _tag_pattern(tag)
+    return frozenset(c["id"] for g in _plan_groups(pid) for _, c in g["courses"] if rx.search(c["title"].lower()))
+
+def _plan_data(pid: ProgramId, tags: List[str]) -> Tuple[List[Dict[str, Any]], List[frozenset]]:
+    groups = _plan_groups(pid)
+    return groups, [_plan_hits(pid, tag, store.version) for tag in tags]
+
+def build_study_plan(pid: ProgramId, tags: List[str]) -> Dict[str, Any]:
+    """
+    План на все семестры: обязательные группы и группы, которые помещаются в свой
+    бюджет, берём целиком, в остальных выбираем курсы рюкзаком по скору тегов так,
+    чтобы набрать бюджет группы. Один и тот же курс дважды не берём. Если обязательная
+    группа больше своего бюджета в плане, курсы не отбрасываем, а помечаем over_budget.
+    """
+    groups, hits = _plan_data(pid, tags)
+    scores: Dict[str, int] = {}
+    for h in hits:
+        for cid in h:
+            scores[cid] = scores.get(cid, 0) + 1
+    taken: set = set()
+    semesters: Dict[int, Dict[str, Any]] = {}
+    score = 0
+    for g in groups:
+        budget = g["budget"]
+        sem = semesters.setdefault(g["semester"], {"semester": g["semester"], "groups": [], "credits": 0})
+        elective = not g["mandatory"] and budget is not None and g["total"] > budget
+        over_budget = g["mandatory"] and budget is not None and g["total"] > budget
+        if not elective:
+            chosen = g["courses"]
+            if not over_budget:
+                budget = g["total"]
+        else:
+            # Курсов с одинаковыми кредитами cr и скором в решение войдёт не больше
+            # budget // cr, и они взаимозаменяемы — берём первые по порядку плана.
+            # Так размер рюкзака не растёт вместе с пулом.
+            slots: Dict[Tuple[int, int], int] = {}
+            pool, seen = [], set()
+            for t, c in g["courses"]:
+                key = (c["credits"], scores.get(c["id"], 0))
+                left = slots.get(key, budget // key[0])
+                if not left or t in taken or t in seen:
+                    continue
+                seen.add(t)
+                slots[key] = left - 1
+                pool.append((key[1], (t, c)))
+            idx = _knapsack([(c["credits"], sc) for sc, (_, c) in pool], budget)
+            chosen = [pool[i][1] for i in idx]
+            score += sum(pool[i][0] for i in idx)
+        taken.update(t for t, _ in chosen)
+        credits = sum(c["credits"] for _, c in chosen)
+        sem["groups"].append({
+            "group": g["group"],
+            "budget": budget,
+            "credits": credits,
+            "elective": elective,
+            "over_budget": over_budget,
+            "courses": [{"title": c["title"], "credits": c["credits"], "hours": c.get("hours")} for _, c in chosen],
+        })
+        sem["credits"] += credits
+    plan = [semesters[k] for k in sorted(semesters)]
+    return {
+        "program": pid,
+        "tags": list(tags),
+        "semesters": plan,
+        "total_credits": sum(s["credits"] for s in plan),
+        "score": score,
+    }
+
+# -------------------- «Похожие курсы»: TF-IDF по символьным n-граммам --------------------
+NGRAM = 3
+SIM_NEIGHBOURS = 10     # сколько соседей храним на курс
+SIM_FEATURE_WEIGHT = 0.3  # вес семестра/кредитов относительно названия
+SIM_MIN_ANCHOR = 0.25     # ниже — считаем, что такого курса нет
+SIM_SKIP_KINDS = ("practice", "gia")
+# Посты частых триграмм (« и », «ние») и признаков семестра/кредитов покрывают почти
+# весь корпус — обход их для каждого курса делает построение квадратичным. Поэтому
+# в посте грамма храним только SIM_POSTING_CAP курсов с наибольшим весом, признаки
+# в посты не кладём и досчитываем только для SIM_CANDIDATES лучших кандидатов.
+# Вклад отрезанных постов (частые граммы с малым idf) теряется — оценка ≈ косинусу:
+# на текущих планах ~96% top-5 соседей совпадают с точным перебором.
+SIM_POSTING_CAP = 24
+SIM_CANDIDATES = 64
+
+@lru_cache(maxsize=1 << 16)
+def _norm_title(title: str) -> str:
+    t = (title or "").lower().replace("ё", "е")
+    return re.sub(r"[^\w+#]+", " ", t).strip()
+
+# предлоги и союзы дают общие триграммы (« на », « и ») и «похожесть» на что угодно
+SIM_STOPWORDS = frozenset("в во и или к на о об от по при с со для из за the of and for in to".split())
+
+def _title_terms(title: str) -> Dict[str, int]:
+    tf: Dict[str, int] = {}
+    for w in _norm_title(title).split():
+        if w in SIM_STOPWORDS:
+            continue
+        w = f" {w} "
+        for i in range(max(1, len(w) - NGRAM + 1)):
+            g = w[i:i + NGRAM]
+            tf[g] = tf.get(g, 0) + 1
+    return tf
+
+def _unit(vec: Dict[str, float]) -> Dict[str, float]:
+    n = sum(v * v for v in vec.values()) ** 0.5
+    return {k: v / n for k, v in vec.items()} if n else {}
+
+class SimilarityIndex:
+    """
+    Разреженные TF-IDF векторы по символьным триграммам названия + признаки
+    семестра/кредитов. Таблица top-k соседей считается один раз на версию store,
+    так что запрос по известному курсу — это O(k) выборка. Посты граммов урезаны
+    до SIM_POSTING_CAP, поэтому построение линейно по числу курсов.
+    """
+    def __init__(self, courses: List[Dict[str, Any]]):
+        # один документ на (программа, название) — дубликаты внутри программы схлопываем
+        seen: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for c in courses:
+            if c.get("kind") in SIM_SKIP_KINDS:
+                continue
+            key = (c["program"], _norm_title(c["title"]))
+            if key[1] and key not in seen:
+                seen[key] = c
+        self.docs: List[Dict[str, Any]] = list(seen.values())
+        self.titles: List[str] = [_norm_title(c["title"]) for c in self.docs]
+        self.by_title: Dict[str, List[int]] = {}
+        for i, t in enumerate(self.titles):
+            self.by_title.setdefault(t, []).append(i)
+
+        tfs = [_title_terms(c["title"]) for c in self.docs]
+        df: Dict[str, int] = {}
+        for tf in tfs:
+            for g in tf:
+                df[g] = df.get(g, 0) + 1
+        n = len(self.docs)
+        self.idf = {g: math.log((1 + n) / (1 + d)) + 1.0 for g, d in df.items()}
+        self.vecs = [self._vector(tf, c) for tf, c in zip(tfs, self.docs)]
+
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, v in enumerate(self.vecs):
+            for g, w in v.items():
+                if not g.startswith("#"):
+                    self.postings.setdefault(g, []).append((i, w))
+        for g, post in self.postings.items():
+            if len(post) > SIM_POSTING_CAP:
+                post.sort(key=lambda x: (-x[1], x[0]))
+                del post[SIM_POSTING_CAP:]
+        self.neighbours: List[List[Tuple[int, float]]] = [
+            self._rank(v, exclude=i, k=SIM_NEIGHBOURS) for i, v in enumerate(self.vecs)
+        ]
+
+    def _vector(self, tf: Dict[str, int], course: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        vec = _unit({g: (1 + math.log(f)) * self.idf.get(g, 0.0) for g, f in tf.items()})
+        if course:
+            feats = {f"#sem:{s}": 1.0 for s in course.get("semesters") or []}
+            if course.get("credits") is not None:
+                feats[f"#cr:{course['credits']}"] = 1.0
+            for g, w in _unit(feats).items():
+                vec[g] = w * SIM_FEATURE_WEIGHT
+            vec = _unit(vec)
+        return vec
+
+    def _rank(self, vec: Dict[str, float], exclude: Optional[int] = None, k: int = SIM_NEIGHBOURS) -> List[Tuple[int, float]]:
+        scores: Dict[int, float] = {}
+        feats = []
+        for g, w in vec.items():
+            if g.startswith("#"):
+                feats.append((g, w))
+                continue
+            for j, wj in self.postings.get(g, ()):
+                scores[j] = scores.get(j, 0.0) + w * wj
+        if len(scores) > SIM_CANDIDATES:
+            scores = dict(heapq.nlargest(SIM_CANDIDATES, scores.items(), key=lambda x: (x[1], -x[0])))
+        # признаки семестра/кредитов в постах нет — досчитываем их только для кандидатов
+        for j in scores:
+            vj = self.vecs[j]
+            scores[j] += sum(w * vj.get(g, 0.0) for g, w in feats)
+        own = self.titles[exclude] if exclude is not None else None
+        ranked = sorted(((s, j) for j, s in scores.items() if self.titles[j] != own),
+                        key=lambda x: (-x[0], x[1]))
+        out: List[Tuple[int, float]] = []
+        titles = set()
+        for sc, j in ranked:
+            t = self.titles[j]
+            if t in titles:  # тот же курс в другой программе — показываем один раз
+                continue
+            titles.add(t)
+            out.append((j, sc))
+            if len(out) >= k:
+                break
+        return out
+
+    def anchor(self, query: str, pid: Optional[ProgramId] = None) -> Optional[int]:
+        """
+        Курс, о котором спрашивают: точное совпадение названия, затем самое короткое
+        название, содержащее запрос, иначе ближайший по n-граммам (если похож достаточно).
+        """
+        q = _norm_title(query)
+        hits = self.by_title.get(q) or []
+        if not hits and len(q) >= NGRAM:
+            subs = [i for i, t in enumerate(self.titles) if q in t]
+            if subs:
+                shortest = min(len(self.titles[i]) for i in subs)
+                hits = [i for i in subs if len(self.titles[i]) == shortest]
+        if hits:
+            pref = [i for i in hits if self.docs[i]["program"] == pid]
+            return (pref or hits)[0]
+        best = self._rank(self._vector(_title_terms(query)), k=1)
+        return best[0][0] if best and best[0][1] >= SIM_MIN_ANCHOR else None
+
+    def similar(self, query: str, k: int = 5, pid: Optional[ProgramId] = None) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        i = self.anchor(query, pid)
+        if i is None:
+            return None, []
+        rows = [dict(self.docs[j], score=round(sc, 3)) for j, sc in self.neighbours[i][:k]]
+        return self.docs[i], rows
+
+_similarity: Dict[str, Any] = {"version": None, "index": None}
+
+def similarity_index() -> SimilarityIndex:
+    """Индекс строится лениво и перестраивается только при смене store.version."""
+    if _similarity["version"] != store.version:
+        _similarity["index"] = SimilarityIndex(store.courses())
+        _similarity["version"] = store.version
+    return _similarity["index"]
+
+def similar_courses(query: str, k: int = 5, pid: Optional[ProgramId] = None) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    return similarity_index().similar(query, k=k, pid=pid)
+
+# -------------------- Сравнение программ по профилям тем --------------------
+@lru_cache(maxsize=1024)
+def _rank_programs(tags: Tuple[str, ...], version: int) -> Tuple[Dict[str, Any], ...]:
+    profiles = store.tag_profiles()
+    ranked = []
+    for pid, prof in profiles.items():
+        credits = prof["credits"]
+        dot = sum(credits.get(t, 0) for t in tags)
+        score = dot / ((len(tags) ** 0.5) * prof["norm"]) if prof["norm"] else 0.0
+        topics = sorted(({"tag": t, "credits": credits[t], "by_semester": dict(sorted(prof["by_semester"].get(t, {}).items()))}
+                         for t in tags if credits.get(t)), key=lambda x: -x["credits"])
+        ranked.append({"program": pid, "title": program_title(pid), "score": round(score, 3),
+                       "credits": dot, "topics": topics})
+    ranked.sort(key=lambda r: (-r["score"], -r["credits"], r["program"]))
+    return tuple(ranked)
+
+def rank_programs(tags: List[str]) -> List[Dict[str, Any]]:
+    """
+    Ранжирует все программы по косинусной близости тегов пользователя к профилю
+    покрытия тем (кредиты по TAG_TO_QUERY). Теги вне TAG_TO_QUERY не учитываются.
+    Результат кэшируется по (набор тегов, версия store).
+    """
+    known = tuple(sorted({t.lower() for t in tags if t.lower() in TAG_TO_QUERY}))
+    if not known:
+        return []
+    return list(_rank_programs(known, store.version))
+
 # -------------------- Правила/Интенты --------------------
 INTENTS = {
     "help": r"\b(помощ|что ты умеешь|help)\b",
@@ -269,11 +681,20 @@ INTENTS = {
     "gia": r"\b(гия|вкр|итогов\w+ аттестац\w+)\b",
     "soft": r"(soft\s*skills|софт\s*скил|майнор|микромодул\w+)",
     "search_course": r"(найд[и]|поиск).*?(курс|дисциплин\w+)\s*:?(.+)",
-    "set_tags": r"(?:теги|tags|бэкграунд|background)\s*:?(.+)",
+    # после «похож…» обязателен «на», «курс…» или двоеточие — иначе «что подобное есть» уходит в поиск соседей
+    "similar": r"(похож\w*|аналогичн\w*|подобн\w*)(?:\s+курс\w*\s*(?:на\b\s*)?:?|\s+на\b\s*:?|\s*:)\s*(.+)",
+    "set_tags": r"\b(?:теги|tags|бэкграунд|background)\b\s*:?(.+)",
     "recommend": r"(рекоменд|рекоменд)\w+(\s*\d\s*семестр)?",
+    "build_plan": r"(собер\w*|состав\w*|построй)\s+(?:мне\s+)?(?:учебн\w+\s+)?план",
     "compare": r"(сравн|что выбрать|какая программ|подходит)\w+",
 }
 
+# re.I — чтобы искать и по исходному тексту, когда из него берётся фрагмент (similar)
+INTENT_RX = {name: re.compile(rx, re.I) for name, rx in INTENTS.items()}
+PRODUCT_RX = re.compile(r"ai\s*product|управлени[ея]\s*ии|product|ai\s*продукт")
+AI_RX = re.compile(r"искусственн\w+\s*интеллект|\bai\b")
+SEMESTER_RX = re.compile(r"(\d)\s*семестр")
+
 INTRO = (
     "👋 Я помогу выбрать между магистратурами ИТМО и спланировать учёбу.\n"
     "Доступные программы: /ai и /aiproduct\n"
@@ -281,10 +702,12 @@ INTRO = (
     "Примеры:\n"
     "• теги: ml, nlp, python, sys\n"
     "• рекомендации 2 семестр\n"
+    "• собери план — элективы на все семестры под кредиты\n"
     "• обязательные дисциплины 1 семестр\n"
     "• выборные 2 семестр\n"
     "• практика / гиа / soft skills\n"
     "• найди курс: глубокое обучение\n"
+    "• похожие на: глубокое обучение\n"
     "• сравни программы / что выбрать\n"
 )
 
@@ -292,12 +715,14 @@ class BotSession:
     def __init__(self):
         self.program: ProgramId = "ai"  # по умолчанию «Искусственный интеллект»
         self.tags: List[str] = []       # короткие теги бэкграунда
+        self.last_intent: Optional[str] = None  # какой интент обработал последний handle()
+        self.last_hits: Optional[int] = None    # сколько результатов нашёл (None — интент без выборки)
 
     def set_program(self, text: str) -> Optional[str]:
         t = text.lower()
-        if re.search(r"ai\s*product|управлени[ея]\s*ии|product|ai\s*продукт", t):
+        if PRODUCT_RX.search(t):
             self.program = "ai_product"
-        elif re.search(r"искусственн\w+\s*интеллект|\bai\b", t):
+        elif AI_RX.search(t):
             self.program = "ai"
         else:
             return None
@@ -311,54 +736,100 @@ class BotSession:
         return f"Теги (бэкграунд) обновлены: {known}\nПодсказка: теперь попроси «рекомендации 2 семестр»."
 
     def _compare_programs(self) -> str:
-        # Очень простая эвристика по тегам
-        tech_bias = any(t in self.tags for t in ["ml", "ds", "cv", "nlp", "dl", "rl", "python", "cpp", "sys", "gpu", "bigdata", "stats"])
-        prod_bias = any(t in self.tags for t in ["product", "pm", "ba", "metrics", "design", "mentoring"])
-        if prod_bias and not tech_bias:
-            sug = "ai_product"
-        elif tech_bias and not prod_bias:
-            sug = "ai"
-        else:
-            sug = self.program  # если не ясно — остаёмся где были
-        return (
-            "Быстрое сравнение:\n"
-            "• AI — больше инженерных и research-курсов (ML/DL/CV/NLP, системные вещи, GPU).\n"
-            "• AI Product — управление ИИ‑продуктами: исследования, метрики, монетизация, PM‑навыки.\n\n"
-            f"По твоим тегам ({', '.join(self.tags) or '—'}) я бы предложил: «{program_title(sug)}».\n"
-            f"Переключиться можно командами: /ai или /aiproduct."
-        )
+        ranked = rank_programs(self.tags)
+        self.last_hits = sum(1 for r in ranked if r["credits"])
+        if not ranked or not ranked[0]["credits"]:
+            return (
+                "Сравнение строится по темам курсов, а твои теги "
+                f"({', '.join(self.tags) or '—'}) ни с одной темой не совпали.\n"
+                f"Задай теги из списка: {', '.join(TAG_TO_QUERY)}.\n"
+                "Пример: «теги: ml, nlp, python». Переключиться можно командами: /ai или /aiproduct."
+            )
+        lines = [f"Сравнение программ по твоим тегам ({', '.join(self.tags)}):"]
+        for i, r in enumerate(ranked, 1):
+            why = ", ".join(f"{x['tag']} {x['credits']} кр." for x in r["topics"][:4]) or "нет курсов по этим темам"
+            lines.append(f"{i}. «{r['title']}» — совпадение {r['score']:.2f}: {why}")
+        lines.append(f"\nЯ бы предложил: «{ranked[0]['title']}».")
+        lines.append("Переключиться можно командами: /ai или /aiproduct.")
+        return "\n".join(lines)
+
+    def _study_plan(self) -> str:
+        plan = build_study_plan(self.program, self.tags)
+        self.last_hits = sum(len(g["courses"]) for sem in plan["semesters"] for g in sem["groups"])
+        out = [f"План ({program_title(self.program)}) по тегам: {', '.join(self.tags)}"]
+        for sem in plan["semesters"]:
+            out.append(f"\nСеместр {sem['semester']} — {sem['credits']} кр.")
+            for g in sem["groups"]:
+                mark = "выбор" if g["elective"] else "обязательно"
+                out.append(f"{g['group']} ({mark}, {g['credits']}/{g['budget']} кр.):")
+                if g["over_budget"]:
+                    out.append("⚠️ обязательных курсов больше, чем кредитов группы в плане — уточни в учебном офисе")
+                out.extend(f"• {c['title']} — {c['credits']} кр., {c.get('hours') or '?'} ч." for c in g["courses"])
+        out.append(f"\nИтого по дисциплинам: {plan['total_credits']} кр.")
+        return "\n".join(out)
+
+    def _similar(self, raw: str) -> str:
+        q = raw.strip(" :«»\"'?!.")
+        if not q:
+            return "Напиши название курса. Пример: «похожие на: глубокое обучение»."
+        anchor, rows = similar_courses(q, k=6, pid=self.program)
+        self.last_hits = len(rows) if anchor else 0
+        if not anchor or not rows:
+            return f"Не нашёл курсов, похожих на «{q}»."
+        lines = [f"• {r['title']} — {program_title(r['program'])}, {r.get('credits') or '?'} кр. "
+                 f"(семестр: {', '.join(map(str, r['semesters'])) or '—'})" for r in rows]
+        return f"Похожие на «{anchor['title']}» ({program_title(anchor['program'])}):\n" + "\n".join(lines)
 
     def handle(self, text: str) -> str:
-        t = (text or "").lower().strip()
-        if not t or re.search(INTENTS["help"], t):
+        self.last_hits = None
+        src = (text or "").strip()
+        t = src.lower()
+        if not t or INTENT_RX["help"].search(t):
+            self.last_intent = "help"
             return INTRO
 
-        if re.search(INTENTS["programs"], t):
-            items = [f"{pid} — {title}" for pid, title in store.list_programs()]
-            return "Доступные программы:\n" + "\n".join(items)
-
-        pick = self.set_program(text)
-        if pick:
-            return pick
+        # «похожие на …» и «теги: …» — первыми: после триггера идёт свободный текст
+        # (название курса, список тегов), в нём бывают «сравнение», «подходит», «product», «AI»
+        m = INTENT_RX["similar"].search(src)
+        if m:
+            self.last_intent = "similar"
+            return self._similar(m.group(2))
 
-        # Установка тегов (бэкграунд)
-        m = re.search(INTENTS["set_tags"], t)
+        m = INTENT_RX["set_tags"].search(t)
         if m:
+            self.last_intent = "set_tags"
             raw = (m.group(1) or "").strip(" :")
             if not raw:
                 return "Напиши теги после двоеточия. Пример: «теги: ml, nlp, python, sys»."
             return self._set_tags_from_text(raw)
 
+        # Сравнение/выбор программы — раньше списка и выбора: «сравни программы ai и ai product»
+        if INTENT_RX["compare"].search(t):
+            self.last_intent = "compare"
+            return self._compare_programs()
+
+        if INTENT_RX["programs"].search(t):
+            self.last_intent = "programs"
+            items = [f"{pid} — {title}" for pid, title in store.list_programs()]
+            return "Доступные программы:\n" + "\n".join(items)
+
+        pick = self.set_program(text)
+        if pick:
+            self.last_intent = "pick_program"
+            return pick
+
         # Рекомендации
-        m = re.search(INTENTS["recommend"], t)
+        m = INTENT_RX["recommend"].search(t)
         if m:
+            self.last_intent = "recommend"
             sem = None
-            m2 = re.search(r"(\d)\s*семестр", t)
+            m2 = SEMESTER_RX.search(t)
             if m2:
                 sem = _safe_int(m2.group(1))
             if not self.tags:
                 return "Сначала задай теги (бэкграунд). Пример: «теги: ml, nlp, python»."
             rows = recommend_electives(self.program, self.tags, semester=sem, top_k=6)
+            self.last_hits = len(rows)
             if not rows:
                 return "Пока не нашёл подходящих выборных — попробуй расширить теги."
             def line(r): 
@@ -368,18 +839,23 @@ class BotSession:
             hdr += f"\nПо тегам: {', '.join(self.tags)}"
             return hdr + "\n" + "\n".join(map(line, rows))
 
-        # Сравнение/выбор программы
-        if re.search(INTENTS["compare"], t):
-            return self._compare_programs()
+        # Полный план под теги
+        if INTENT_RX["build_plan"].search(t):
+            self.last_intent = "build_plan"
+            if not self.tags:
+                return "Сначала задай теги (бэкграунд). Пример: «теги: ml, nlp, python»."
+            return self._study_plan()
 
         # Обяз/выборные
-        m = re.search(INTENTS["mandatory"], t)
+        m = INTENT_RX["mandatory"].search(t)
         if m:
+            self.last_intent = "mandatory"
             sem = _safe_int(m.group(2))
             if not sem:
                 return "Укажи номер семестра (например: «обязательные дисциплины 1 семестр»)."
             if self.program == "ai":
                 rows = get_mandatory_courses_ai(sem)
+                self.last_hits = len(rows)
                 if not rows:
                     return f"В семестре {sem} нет обязательных дисциплин или данные отсутствуют."
                 lines = [f"• {r['title']} — {r.get('credits','?')} кр., {r.get('hours','?')} ч." for r in rows]
@@ -388,13 +864,15 @@ class BotSession:
                 # в AI Product обязательные лежат в секции «Обязательные дисциплины. 1 семестр»
                 rows = [r for r in search_courses("ai_product", "") if r.get("semester") == sem]
                 rows = rows[:20]
+                self.last_hits = len(rows)
                 if not rows:
                     return f"Обязательные для семестра {sem} не найдены."
                 lines = [f"• {r['title']} — {r.get('credits','?')} кр., {r.get('hours','?')} ч." for r in rows]
                 return f"Обязательные дисциплины (семестр {sem}, {program_title(self.program)}):\n" + "\n".join(lines)
 
-        m = re.search(INTENTS["selective"], t)
+        m = INTENT_RX["selective"].search(t)
         if m:
+            self.last_intent = "selective"
             sem = _safe_int(m.group(2))
             if not sem:
                 return "Укажи номер семестра (например: «выборные 2 семестр»)."
@@ -402,6 +880,7 @@ class BotSession:
                 rows = get_selective_courses_ai(sem)
             else:
                 rows = [c for c in search_courses("ai_product", "") if c.get("semester") == sem]
+            self.last_hits = len(rows)
             if not rows:
                 return f"Выборные дисциплины не найдены для семестра {sem}."
             lines = []
@@ -410,8 +889,10 @@ class BotSession:
                 lines.append(f"• {title} — {r.get('credits','?')} кр., {r.get('hours','?')} ч.")
             return f"Выборные дисциплины (семестр {sem}, {program_title(self.program)}):\n" + "\n".join(lines)
 
-        if re.search(INTENTS["practice"], t):
+        if INTENT_RX["practice"].search(t):
+            self.last_intent = "practice"
             rows = get_practice(self.program)
+            self.last_hits = len(rows)
             if not rows:
                 return "Данных о практике не найдено."
             def fmt(x):
@@ -422,8 +903,10 @@ class BotSession:
                 return f"• {title} (семестр: {sem}) — {cr} кр., {hrs} ч."
             return f"Практика — {program_title(self.program)}:\n" + "\n".join(map(fmt, rows))
 
-        if re.search(INTENTS["gia"], t):
+        if INTENT_RX["gia"].search(t):
+            self.last_intent = "gia"
             rows = get_gia(self.program)
+            self.last_hits = len(rows)
             if not rows:
                 return "Данных по ГИА/ВКР не найдено."
             def fmt(x):
@@ -434,8 +917,10 @@ class BotSession:
                 return f"• {title} (семестр: {sem}) — {cr} кр., {hrs} ч."
             return f"ГИА/ВКР — {program_title(self.program)}:\n" + "\n".join(map(fmt, rows))
 
-        if re.search(INTENTS["soft"], t):
+        if INTENT_RX["soft"].search(t):
+            self.last_intent = "soft"
             rows = get_soft_skills(self.program)
+            self.last_hits = len(rows)
             if not rows:
                 return "Софт‑скиллы не найдены."
             def title_of(x):
@@ -443,12 +928,14 @@ class BotSession:
             lines = [f"• {title_of(r)} — {r.get('credits','?')} кр., {r.get('hours','?')} ч." for r in rows]
             return f"Soft Skills / майноры — {program_title(self.program)}:\n" + "\n".join(lines)
 
-        m = re.search(INTENTS["search_course"], t)
+        m = INTENT_RX["search_course"].search(t)
         if m:
+            self.last_intent = "search_course"
             q = (m.group(3) or "").strip(" :")
             if not q:
                 return "Напиши, что искать. Пример: «найди курс: глубокое обучение»."
             rows = search_courses(self.program, q)
+            self.last_hits = len(rows)
             if not rows:
                 return f"Ничего не найдено по запросу «{q}»."
             lines = [f"• {r.get('title')} — {r.get('credits','?')} кр., {r.get('hours','?')} ч." for r in rows[:20]]
@@ -456,5 +943,48 @@ class BotSession:
             return f"Найдено по «{q}» — {program_title(self.program)}:\n" + "\n".join(lines) + more
 
         # Жёсткий фильтр релевантности
+        self.last_intent = "off_topic"
         return ("Я отвечаю только на вопросы по двум магистратурам ИТМО, их учебным планам и выбору между ними.\n"
                 "Спроси, например: «сравни программы», «рекомендации 2 семестр», «выборные 2 семестр», «практика», «soft skills», «найди курс: …»")
+
+
+# -------------------- Прогрев --------------------
+# самые частые запросы (по примерам из INTRO) — прогоняем их на старте, чтобы
+# первый живой пользователь не платил за ленивые индексы и кэши
+WARMUP_QUERIES = [
+    "help", "программы", "сравни программы", "собери план",
+    "рекомендации 1 семестр", "рекомендации 2 семестр", "рекомендации 3 семестр", "рекомендации 4 семестр",
+    "обязательные дисциплины 1 семестр", "обязательные дисциплины 2 семестр",
+    "выборные 1 семестр", "выборные 2 семестр", "выборные 3 семестр", "выборные 4 семестр",
+    "практика", "вкр", "soft skills", "найди курс: машинное обучение", "похожие на: глубокое обучение",
+]
+WARMUP_TAGS = ["ml", "nlp", "python", "sys"]
+
+def warmup() -> Dict[str, float]:
+    """
+    Загружает store (он ленивый), строит все его индексы, компилирует шаблоны интентов и тегов и прогоняет
+    частые запросы по каждой программе. Возвращает время этапов в мс.
+    """
+    timings: Dict[str, float] = {}
+
+    def step(name: str, fn):
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = round((time.perf_counter() - t0) * 1000, 2)
+
+    step("store", store._ensure_loaded)
+    step("patterns", lambda: [_tag_pattern(tag) for tag in TAG_TO_QUERY])
+    step("similarity", similarity_index)
+    step("profiles", store.tag_profiles)
+    step("plans", lambda: [_plan_data(pid, list(TAG_TO_QUERY)) for pid in PLAN_PATHS])
+    step("compare", lambda: [rank_programs([tag]) for tag in TAG_TO_QUERY])
+
+    def queries():
+        for pid in PLAN_PATHS:
+            s = BotSession()
+            s.program = pid
+            s.tags = list(WARMUP_TAGS)
+            for q in WARMUP_QUERIES:
+                s.handle(q)
+    step("queries", queries)
+    return timings
@@ -0,0 +1,289 @@
+# curriculum.py
+"""
+Общие утилиты над JSON учебных планов (только stdlib — можно импортировать
+и из бота, и из скрапера).
+
+- iter_courses: обход дерева плана любой из двух схем (ai / ai_product)
+- diff_plans: структурный дифф по идентичности курса (программа, семестр, название)
+- iter_records / write_jsonl / read_jsonl: единый плоский формат «один курс — одна строка»
+- atomic_write_text / save_plan: запись через временный файл + os.replace и changelog
+
+Формат curriculum.jsonl: для каждой программы сначала строка-заголовок
+{"type": "program", "program", "title", "total_credits", "total_hours", "courses"},
+затем её курсы {"type": "course", "program", "id", "title", "semesters", "credits",
+"hours", "kind", "block", "module", "group", "group_credits"}.
+id = "программа:семестр:название" (+ «#n» для повторов) — не зависит от порядка курсов.
+kind: mandatory | elective | practice | gia | soft | optional | universal.
+"""
+from __future__ import annotations
+import json
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# ключи, по которым в дереве спускаемся к вложенным узлам
+_CHILD_KEYS = ("blocks", "modules", "sub_modules", "semesters", "course_groups",
+               "sections", "sub_sections", "courses", "practices", "components")
+
+CourseKey = Tuple[str, str, str]  # (program, semester, title)
+
+# -------------------- Обход дерева --------------------
+def _course_title(node: Dict[str, Any]) -> Optional[str]:
+    title = node.get("title") or node.get("name") or node.get("module_name")
+    if not title and node.get("options"):
+        title = " / ".join(node["options"])
+    return title
+
+def _is_course(node: Dict[str, Any]) -> bool:
+    # лист дерева с кредитами/часами; группы (sub_modules и т.п.) несут вложенные списки
+    if any(isinstance(node.get(k), list) for k in _CHILD_KEYS):
+        return False
+    return ("credits" in node or "hours" in node) and bool(_course_title(node))
+
+def _walk(node: Any, ctx: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    if isinstance(node, list):
+        for x in node:
+            yield from _walk(x, ctx)
+        return
+    if not isinstance(node, dict):
+        return
+    if _is_course(node):
+        yield ctx, node
+        return
+    sub = dict(ctx)
+    if "block_name" in node:
+        sub["block"] = node["block_name"]
+    if "module_name" in node:
+        sub["module"] = node["module_name"]
+    if "semester_number" in node:
+        sub["semester"] = node["semester_number"]
+    group = node.get("group_type") or node.get("section_name") or (node.get("name") if "courses" in node else None)
+    if group:
+        sub["group"] = group
+        sub["group_node"] = node
+    for k in _CHILD_KEYS:
+        if k in node:
+            yield from _walk(node[k], sub)
+
+def iter_courses(data: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(контекст, курс) для каждого курса плана; контекст: block/module/group/semester."""
+    root = data.get("curriculum", data)
+    yield from _walk(root.get("blocks", []), {})
+
+def course_semester(ctx: Dict[str, Any], course: Dict[str, Any]) -> Any:
+    sem = course.get("semester")
+    return ctx.get("semester") if sem is None else sem
+
+def course_key(pid: str, ctx: Dict[str, Any], course: Dict[str, Any]) -> CourseKey:
+    sem = course_semester(ctx, course)
+    return (pid, "" if sem is None else str(sem), _course_title(course) or "")
+
+# -------------------- Канонические записи --------------------
+def course_id(key: CourseKey, n: int = 1) -> str:
+    """
+    Стабильный id курса из (программа, семестр, название): вставка курса не сдвигает
+    id остальных. n — номер повтора того же ключа (курс в двух группах), с 2-го — «#n».
+    """
+    pid, sem, title = key
+    return f"{pid}:{sem}:{title}" + (f"#{n}" if n > 1 else "")
+
+def program_name(data: Dict[str, Any]) -> str:
+    root = data.get("curriculum", data)
+    return root.get("program_name") or data.get("curriculum_name") or ""
+
+def _semesters(ctx: Dict[str, Any], course: Dict[str, Any]) -> List[int]:
+    sem = course_semester(ctx, course)
+    if sem is None:
+        # «Пул выбора 2 сем», «Soft Skills (1-3 семестры)» — диапазон раскрываем целиком
+        m = re.search(r"(\d)(?:\s*[-–]\s*(\d))?\s*сем", ctx.get("group", ""))
+        if not m:
+            return []
+        lo, hi = int(m.group(1)), int(m.group(2) or m.group(1))
+        return list(range(lo, hi + 1))
+    return [int(x) for x in re.findall(r"\d", str(sem))]
+
+def _kind(ctx: Dict[str, Any]) -> str:
+    block = ctx.get("block", "").lower()
+    group = ctx.get("group", "").lower()
+    where = " ".join((block, ctx.get("module", "").lower(), group))
+    if "практика" in block:
+        return "practice"
+    if "гиа" in block:
+        return "gia"
+    if "soft skills" in where or "майнор" in where:
+        return "soft"
+    if "факультатив" in block:
+        return "optional"
+    if "обязат" in group:
+        return "mandatory"
+    if ctx.get("module", "").startswith("Индивидуальная профессиональная подготовка"):
+        return "elective"
+    return "universal"
+
+def _group_credits(ctx: Dict[str, Any]) -> Optional[int]:
+    g = ctx.get("group_node") or {}
+    for k in ("total_credits_for_path", "total_credits", "credits"):
+        if g.get(k) is not None:
+            return g[k]
+    return None
+
+def iter_records(pid: str, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Заголовок программы и затем её курсы в каноническом плоском виде."""
+    root = data.get("curriculum", data)
+    blocks = root.get("blocks", [])
+    courses = []
+    seen: Dict[CourseKey, int] = {}
+    for ctx, c in iter_courses(data):
+        key = course_key(pid, ctx, c)
+        n = seen[key] = seen.get(key, 0) + 1
+        courses.append({
+            "type": "course",
+            "program": pid,
+            "id": course_id(key, n),
+            "title": _course_title(c),
+            "semesters": _semesters(ctx, c),
+            "credits": c.get("credits"),
+            "hours": c.get("hours"),
+            "kind": _kind(ctx),
+            "block": ctx.get("block"),
+            "module": ctx.get("module"),
+            "group": ctx.get("group"),
+            "group_credits": _group_credits(ctx),
+        })
+    yield {
+        "type": "program",
+        "program": pid,
+        "title": program_name(data),
+        "total_credits": sum(b.get("total_credits") or 0 for b in blocks),
+        "total_hours": sum(b.get("total_hours") or 0 for b in blocks),
+        "courses": len(courses),
+    }
+    yield from courses
+
+def write_jsonl(path: Path, plans: Dict[str, Dict[str, Any]]) -> None:
+    lines = (json.dumps(r, ensure_ascii=False) for pid, data in plans.items() for r in iter_records(pid, data))
+    atomic_write_text(path, "\n".join(lines) + "\n")
+
+def load_plans(data_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Все <pid>_plan.json папки — curriculum.jsonl всегда собирается по полному набору программ."""
+    return {p.name[:-len("_plan.json")]: json.loads(p.read_text(encoding="utf-8"))
+            for p in sorted(Path(data_dir).glob("*_plan.json"))}
+
+def read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Потоковое чтение curriculum.jsonl — без загрузки файла целиком."""
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# -------------------- Дифф --------------------
+def _index(pid: str, data: Optional[Dict[str, Any]]) -> Dict[CourseKey, List[Dict[str, Any]]]:
+    idx: Dict[CourseKey, List[Dict[str, Any]]] = {}
+    if not data:
+        return idx
+    for ctx, c in iter_courses(data):
+        idx.setdefault(course_key(pid, ctx, c), []).append(
+            {"credits": c.get("credits"), "hours": c.get("hours")}
+        )
+    return idx
+
+def diff_plans(pid: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Изменения между двумя версиями плана одной программы.
+    Курс идентифицируется тройкой (программа, семестр, название); повторы
+    одного ключа (один курс в двух группах) сравниваются попарно по порядку.
+    """
+    a, b = _index(pid, old), _index(pid, new)
+    out: List[Dict[str, Any]] = []
+    for key in sorted(set(a) | set(b)):
+        olds, news = a.get(key, []), b.get(key, [])
+        for i in range(max(len(olds), len(news))):
+            before = olds[i] if i < len(olds) else None
+            after = news[i] if i < len(news) else None
+            rec = {"program": key[0], "semester": key[1] or None, "title": key[2]}
+            if before is None:
+                out.append({"op": "added", **rec, **after})
+            elif after is None:
+                out.append({"op": "removed", **rec, **before})
+            elif before != after:
+                changed = {f: [before[f], after[f]] for f in before if before[f] != after[f]}
+                out.append({"op": "changed", **rec, "fields": changed})
+    return out
+
+def affected_programs(changes: List[Dict[str, Any]]) -> List[str]:
+    return sorted({c["program"] for c in changes})
+
+# -------------------- Запись --------------------
+def _file_mode(path: Path) -> int:
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """Пишем во временный файл рядом и атомарно подменяем — читатель видит либо старый, либо новый файл."""
+    import tempfile  # нужен только писателям; бот импортирует модуль ради iter_records
+
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp создаёт файл с 0600 — возвращаем права старого файла (или обычные для нового),
+        # иначе бот под другим пользователем перестанет читать планы
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def append_changelog(path: Path, changes: List[Dict[str, Any]], ts: str) -> None:
+    """Changelog в JSON Lines: одна запись на изменение, с отметкой запуска."""
+    if not changes:
+        return
+    with Path(path).open("a", encoding="utf-8") as f:
+        for c in changes:
+            f.write(json.dumps({"ts": ts, **c}, ensure_ascii=False) + "\n")
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def save_plan(out: Path, pid: str, data: Dict[str, Any], stamp: str) -> List[Dict[str, Any]]:
+    """
+    Сравниваем с текущим файлом, пишем новый атомарно и дописываем changelog.
+    Если план не изменился, файл не трогаем. Возвращаем список изменений.
+    """
+    path = Path(out) / f"{pid}_plan.json"
+    old = _read_json(path)
+    changes = diff_plans(pid, old, data)
+    if old is not None and not changes and old == data:
+        return changes
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+    append_changelog(Path(out) / "changelog.jsonl", changes, stamp)
+    return changes
+
+# -------------------- CLI --------------------
+def main():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Собрать curriculum.jsonl из *_plan.json")
+    ap.add_argument("--data", type=Path, default=Path("data"), help="Папка с *_plan.json")
+    args = ap.parse_args()
+    plans = load_plans(args.data)
+    write_jsonl(args.data / "curriculum.jsonl", plans)
+    print(f"OK: {args.data / 'curriculum.jsonl'} ({', '.join(plans)})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# health.py
+"""
+Liveness/readiness для контейнера: маленький HTTP-сервер в фоновом потоке.
+
+GET /healthz — 200, пока процесс жив
+GET /readyz  — 503 до окончания прогрева, затем 200 (+ время этапов прогрева в JSON)
+
+Пример healthcheck для docker-compose:
+  healthcheck:
+    test: ["CMD", "python", "-c", "import urllib.request; urllib.request.urlopen('http://127.0.0.1:8081/readyz')"]
+    interval: 5s
+    retries: 12
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8081"))
+# по умолчанию только локально (healthcheck выполняется внутри контейнера);
+# HEALTH_HOST=0.0.0.0 — если пробы дёргает оркестратор снаружи
+HEALTH_HOST = os.getenv("HEALTH_HOST", "127.0.0.1")
+
+class Readiness:
+    def __init__(self):
+        self._ready = threading.Event()
+        self.details: Dict[str, Any] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def set_ready(self, **details: Any):
+        self.details = details
+        self._ready.set()
+
+state = Readiness()
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._reply(200, {"status": "alive"})
+        elif self.path == "/readyz":
+            if state.ready:
+                self._reply(200, {"status": "ready", **state.details})
+            else:
+                self._reply(503, {"status": "warming up"})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def _reply(self, code: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # пробы дёргают часто — не засоряем лог
+        pass
+
+def start_health_server(port: Optional[int] = None, host: Optional[str] = None) -> ThreadingHTTPServer:
+    srv = ThreadingHTTPServer((host or HEALTH_HOST, port or HEALTH_PORT), _Handler)
+    threading.Thread(target=srv.serve_forever, name="health", daemon=True).start()
+    return srv
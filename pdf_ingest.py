@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальный разбор учебных планов из PDF (data/raw/*_plan.pdf) в JSON,
+совместимый с bot_core.py (ai_plan.json, ai_product_plan.json) — без внешних сервисов.
+
+Страницы обрабатываются параллельно в пуле процессов; результат по каждой
+странице кэшируется по sha256 файла, так что повторный запуск без изменений PDF
+почти мгновенный.
+
+Быстрый запуск:
+  python pdf_ingest.py --raw data/raw --out data
+"""
+
+import re
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from curriculum import affected_programs, atomic_write_text, load_plans, save_plan, write_jsonl
+
+CACHE_DIR = ".cache"
+# версия формата кэша — поднять, если меняется _extract_page
+CACHE_VERSION = 1
+
+Row = Tuple[str, str, Optional[int], Optional[int]]  # (семестр, название, кредиты, часы)
+
+# ---------- Извлечение страниц ----------
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _require_pdfplumber():
+    # pdfplumber (pdfminer) грузится долго и нужен только для извлечения; кэш читается и без него
+    try:
+        import pdfplumber
+    except ImportError:
+        raise RuntimeError("Для разбора PDF нужен пакет pdfplumber: pip install pdfplumber") from None
+    return pdfplumber
+
+def _page_count(path: Path) -> int:
+    pdfplumber = _require_pdfplumber()
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+def _extract_page(job: Tuple[str, int]) -> Dict[str, Any]:
+    """Выполняется в воркере: текст и таблицы (списки строк-ячеек) одной страницы."""
+    path, no = job
+    pdfplumber = _require_pdfplumber()
+    with pdfplumber.open(path) as pdf:
+        page = pdf.pages[no]
+        return {
+            "text": page.extract_text() or "",
+            "tables": page.extract_tables() or [],
+        }
+
+def _cache_path(raw_dir: Path, digest: str, no: int) -> Path:
+    return raw_dir / CACHE_DIR / f"v{CACHE_VERSION}" / digest / f"{no}.json"
+
+def extract_pages(pdfs: List[Path], workers: Optional[int] = None) -> Dict[Path, List[Dict[str, Any]]]:
+    """
+    Постраничное извлечение для нескольких PDF сразу.
+    Из кэша берём всё, что есть; недостающие страницы всех файлов уходят в один пул.
+    """
+    pages: Dict[Path, List[Optional[Dict[str, Any]]]] = {}
+    todo: List[Tuple[Path, int, Path]] = []
+    for pdf in pdfs:
+        digest = file_hash(pdf)
+        meta = _cache_path(pdf.parent, digest, 0).parent / "pages"
+        if meta.exists():
+            n = int(meta.read_text())
+        else:
+            n = _page_count(pdf)
+            meta.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(meta, str(n))
+        pages[pdf] = [None] * n
+        for no in range(n):
+            cp = _cache_path(pdf.parent, digest, no)
+            if cp.exists():
+                pages[pdf][no] = json.loads(cp.read_text(encoding="utf-8"))
+            else:
+                todo.append((pdf, no, cp))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = ex.map(_extract_page, [(str(p), no) for p, no, _ in todo])
+            for (pdf, no, cp), res in zip(todo, results):
+                cp.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write_text(cp, json.dumps(res, ensure_ascii=False))
+                pages[pdf][no] = res
+    return pages
+
+# ---------- Строки таблицы ----------
+
+def clean_text(x: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", (x or "").strip())
+
+def num_or_none(x: Optional[str]) -> Optional[int]:
+    try:
+        return int(clean_text(x))
+    except Exception:
+        return None
+
+# запасной вариант, если таблица не распозналась: «1 Название 3 108» / «Название 3 108»
+_TEXT_ROW = re.compile(r"^((?:\d,\s*)*\d)?\s*(.+?)\s+(\d+)\s+(\d+)$")
+
+def page_rows(page: Dict[str, Any]) -> List[Row]:
+    rows: List[Row] = []
+    for table in page.get("tables", []):
+        for cells in table:
+            cells = list(cells) + [None] * (4 - len(cells))
+            sem, name, cr, hr = (cells[0], cells[1], cells[2], cells[3])
+            name = clean_text(name)
+            if not name or num_or_none(cr) is None:
+                continue  # заголовок таблицы / шапка колонок
+            rows.append((clean_text(sem).replace(" ", ""), name, num_or_none(cr), num_or_none(hr)))
+    if rows or page.get("tables"):
+        return rows
+    for line in page.get("text", "").splitlines():
+        m = _TEXT_ROW.match(line.strip())
+        if m:
+            rows.append(((m.group(1) or "").replace(" ", ""), m.group(2), int(m.group(3)), int(m.group(4))))
+    return rows
+
+def program_name(pages: List[Dict[str, Any]]) -> str:
+    for page in pages:
+        m = re.search(r"ОП\s+(.+)", page.get("text", ""))
+        if m:
+            return clean_text(m.group(1))
+    return ""
+
+# ---------- Дерево блок → модуль → группа ----------
+
+def _semester(sem: str):
+    """'1' -> 1, '1,2,3' -> '1,2,3' (так же, как в ai_product_plan.json)."""
+    if sem.isdigit():
+        return int(sem)
+    return sem or None
+
+def build_tree(rows: List[Row]) -> List[Dict[str, Any]]:
+    """
+    В PDF план — плоская таблица: строки без семестра — заголовки, с семестром — курсы.
+    «Блок N.» открывает блок, «…подготовка» в блоке — модуль, остальные заголовки — группы.
+    """
+    blocks: List[Dict[str, Any]] = []
+    block = module = group = None
+    for sem, name, cr, hr in rows:
+        if not sem:
+            node = {"name": name, "credits": cr, "hours": hr, "groups": [], "modules": [], "courses": []}
+            if name.startswith("Блок"):
+                block, module, group = node, None, None
+                blocks.append(block)
+            elif block is None:
+                continue
+            elif "подготовка" in name.lower():
+                module, group = node, None
+                block["modules"].append(module)
+            else:
+                group = node
+                (module or block)["groups"].append(group)
+            continue
+        course = {"title": name, "semester": _semester(sem), "credits": cr, "hours": hr}
+        target = group or module or block
+        if target is not None:
+            target["courses"].append(course)
+    return blocks
+
+def _group_semester(name: str) -> Optional[int]:
+    m = re.search(r"(\d)\s*сем", name)
+    return int(m.group(1)) if m else None
+
+def _all_groups(block: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return block["groups"] + [g for m in block["modules"] for g in m["groups"]]
+
+# ---------- Схема ai_plan.json ----------
+
+def to_ai_schema(title: str, blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def short(c):
+        return {"title": c["title"], "credits": c["credits"], "hours": c["hours"]}
+
+    out_blocks: List[Dict[str, Any]] = []
+    soft: List[Dict[str, Any]] = []
+    for b in blocks:
+        ob: Dict[str, Any] = {"block_name": b["name"], "total_credits": b["credits"], "total_hours": b["hours"]}
+        lname = b["name"].lower()
+        if "модули" in lname and "факультатив" not in lname:
+            ob["modules"] = []
+            for m in b["modules"]:
+                om = {"module_name": m["name"], "total_credits": m["credits"], "total_hours": m["hours"]}
+                if m["name"].startswith("Индивидуальная профессиональная подготовка"):
+                    by_sem: Dict[int, List[Dict[str, Any]]] = {}
+                    for g in m["groups"]:
+                        sem = _group_semester(g["name"])
+                        if sem is None:
+                            continue
+                        gt = "Обязательные дисциплины" if "обязат" in g["name"].lower() else "Путь выбора дисциплин"
+                        by_sem.setdefault(sem, []).append({
+                            "group_type": gt,
+                            "total_credits_for_path": g["credits"],
+                            "total_hours_for_path": g["hours"],
+                            "courses": [short(c) for c in g["courses"]],
+                        })
+                    om["semesters"] = [{"semester_number": s, "course_groups": gs} for s, gs in sorted(by_sem.items())]
+                else:
+                    om["sub_modules"] = [
+                        {"name": g["name"], "credits": g["credits"], "hours": g["hours"],
+                         "courses": [short(c) for c in g["courses"]]}
+                        for g in m["groups"] if g["courses"]
+                    ]
+                ob["modules"].append(om)
+        elif "практика" in lname:
+            practices = []
+            for g in b["groups"]:
+                if "по выбору" in g["name"].lower() and g["courses"]:
+                    first = g["courses"][0]
+                    practices.append({"type": "Практика по выбору", "semester": first["semester"],
+                                      "credits": first["credits"], "hours": first["hours"],
+                                      "options": [c["title"] for c in g["courses"]]})
+                else:
+                    practices.extend({"type": g["name"], "title": c["title"], "semester": c["semester"],
+                                      "credits": c["credits"], "hours": c["hours"]} for c in g["courses"])
+            ob["practices"] = practices
+        elif "гиа" in lname:
+            ob["components"] = [short(c) for g in b["groups"] for c in g["courses"]]
+        else:
+            # факультативы; микромодули Soft Skills бот ищет в отдельном блоке «Майнорский факультет»
+            ob["courses"] = []
+            for g in b["groups"]:
+                dst = soft if "soft skills" in g["name"].lower() else ob["courses"]
+                dst.extend(short(c) for c in g["courses"])
+        out_blocks.append(ob)
+    if soft:
+        # итог — из строк групп Soft Skills в PDF: каталог микромодулей в факультативах
+        # идёт с 0 з.е., а зачётные единицы («Микромодули Soft Skills … 3 108») стоят
+        # в универсальной подготовке — студент набирает их из каталога, а не проходит весь
+        groups = [g for b in blocks for g in _all_groups(b) if "soft skills" in g["name"].lower()]
+        out_blocks.append({"block_name": "Майнорский факультет (Soft Skills)",
+                           "total_credits": sum(g["credits"] or 0 for g in groups),
+                           "total_hours": sum(g["hours"] or 0 for g in groups),
+                           "courses": soft})
+    return {"curriculum": {"program_name": title, "blocks": out_blocks}}
+
+# ---------- Схема ai_product_plan.json ----------
+
+def to_ai_product_schema(title: str, blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def course(c):
+        return {"name": c["title"], "semester": c["semester"], "credits": c["credits"], "hours": c["hours"]}
+
+    out_blocks: List[Dict[str, Any]] = []
+    for b in blocks:
+        ob: Dict[str, Any] = {"block_name": b["name"], "total_credits": b["credits"], "total_hours": b["hours"]}
+        lname = b["name"].lower()
+        if b["modules"]:
+            ob["modules"] = [
+                {"module_name": m["name"], "total_credits": m["credits"], "total_hours": m["hours"],
+                 "sections": [{"section_name": g["name"], "total_credits": g["credits"], "total_hours": g["hours"],
+                               "courses": [course(c) for c in g["courses"]]} for g in m["groups"]]}
+                for m in b["modules"]
+            ]
+        elif "гиа" in lname:
+            mods = []
+            for g in b["groups"]:
+                mods.append({"module_name": g["name"], "total_credits": g["credits"], "total_hours": g["hours"]})
+                mods.extend({"module_name": c["title"], "semester": c["semester"],
+                             "credits": c["credits"], "hours": c["hours"]} for c in g["courses"])
+            ob["modules"] = mods
+        else:
+            mods = []
+            for g in b["groups"]:
+                mod = {"module_name": g["name"], "total_credits": g["credits"], "total_hours": g["hours"]}
+                if g["courses"]:
+                    mod["courses"] = [course(c) for c in g["courses"]]
+                mods.append(mod)
+            ob["modules"] = mods
+        out_blocks.append(ob)
+    return {"curriculum_name": f"Учебный план ОП {title}", "blocks": out_blocks}
+
+SCHEMAS = {
+    "ai": to_ai_schema,
+    "ai_product": to_ai_product_schema,
+}
+
+def parse_pdf_pages(pid: str, pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows: List[Row] = []
+    for page in pages:
+        rows.extend(page_rows(page))
+    return SCHEMAS[pid](program_name(pages), build_tree(rows))
+
+# ---------- CLI ----------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--raw", type=Path, default=Path("data/raw"), help="Папка с *_plan.pdf")
+    ap.add_argument("--out", type=Path, default=Path("data"), help="Папка для JSON")
+    ap.add_argument("--workers", type=int, default=None, help="Процессов в пуле (по умолчанию — по числу CPU)")
+    args = ap.parse_args()
+    args.out.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    pdfs = {p.stem[:-len("_plan")]: p for p in sorted(args.raw.glob("*_plan.pdf"))}
+    pdfs = {pid: p for pid, p in pdfs.items() if pid in SCHEMAS}
+    pages = extract_pages(list(pdfs.values()), workers=args.workers)
+
+    changes: List[Dict[str, Any]] = []
+    plans = {pid: parse_pdf_pages(pid, pages[pdf]) for pid, pdf in pdfs.items()}
+    for pid, data in plans.items():
+        changes += save_plan(args.out, pid, data, stamp)
+    # PDF может быть не у всех программ — остальные берём из уже лежащих *_plan.json
+    write_jsonl(args.out / "curriculum.jsonl", load_plans(args.out))
+
+    print(f"OK: {', '.join(f'{pid}_plan.json' for pid in pdfs)}, curriculum.jsonl готовы за {time.perf_counter() - t0:.2f} с")
+    if changes:
+        print(f"Изменения: {len(changes)} (программы: {', '.join(affected_programs(changes))}), "
+              f"см. {args.out / 'changelog.jsonl'}")
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,18 @@
   python scraper_itmo.py --out data
 """
 
+from __future__ import annotations
+
 import re
-import json
 import time
 import argparse
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-import requests
-from bs4 import BeautifulSoup
-from slugify import slugify
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+if TYPE_CHECKING:  # requests/bs4 тяжёлые — импортируем там, где реально качаем и парсим
+    from bs4 import BeautifulSoup
+
+from curriculum import affected_programs, atomic_write_text, save_plan, write_jsonl
 
 HDRS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -31,6 +34,8 @@ URLS = {
 # ---------- Утилиты ----------
 
 def fetch(url: str, retries: int = 3, sleep: float = 1.0) -> str:
+    import requests
+
     last = None
     for i in range(retries):
         try:
@@ -116,6 +121,8 @@ def extract_table_rows(block_nodes: List[BeautifulSoup]) -> List[List[str]]:
 # ---------- Парсинг «по смыслу» ----------
 
 def parse_ai(html: str) -> Dict[str, Any]:
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "lxml")
 
     program_name = "Искусственный интеллект"
@@ -221,6 +228,8 @@ def parse_ai(html: str) -> Dict[str, Any]:
     return data
 
 def parse_ai_product(html: str) -> Dict[str, Any]:
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "lxml")
     curriculum_name = "Учебный план ОП Управление ИИ-продуктами/AI Product"
 
@@ -303,20 +312,24 @@ def main():
     ap.add_argument("--out", type=Path, default=Path("data"), help="Папка для JSON")
     args = ap.parse_args()
     args.out.mkdir(parents=True, exist_ok=True)
-
-    # AI
-    html_ai = fetch(URLS["ai"])
-    (args.out / "ai.html").write_text(html_ai, encoding="utf-8")
-    ai_json = parse_ai(html_ai)
-    (args.out / "ai_plan.json").write_text(json.dumps(ai_json, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    # AI Product
-    html_prod = fetch(URLS["ai_product"])
-    (args.out / "ai_product.html").write_text(html_prod, encoding="utf-8")
-    prod_json = parse_ai_product(html_prod)
-    (args.out / "ai_product_plan.json").write_text(json.dumps(prod_json, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    print("OK: data/ai_plan.json, data/ai_product_plan.json готовы")
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    changes: List[Dict[str, Any]] = []
+    plans: Dict[str, Dict[str, Any]] = {}
+    for pid, parse in (("ai", parse_ai), ("ai_product", parse_ai_product)):
+        html = fetch(URLS[pid])
+        atomic_write_text(args.out / f"{pid}.html", html)
+        plans[pid] = parse(html)
+        changes += save_plan(args.out, pid, plans[pid], stamp)
+    write_jsonl(args.out / "curriculum.jsonl", plans)
+
+    print("OK: data/ai_plan.json, data/ai_product_plan.json, data/curriculum.jsonl готовы")
+    if changes:
+        ops = {op: sum(1 for c in changes if c["op"] == op) for op in ("added", "removed", "changed")}
+        print(f"Изменения: +{ops['added']} -{ops['removed']} ~{ops['changed']} "
+              f"(программы: {', '.join(affected_programs(changes))}), см. {args.out / 'changelog.jsonl'}")
+    else:
+        print("Изменений в курсах нет")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Отчёт о времени холодного импорта модулей проекта по `python -X importtime`.
+
+Каждый модуль импортируется в отдельном чистом интерпретаторе; печатаем суммарное
+время импорта и самые дорогие зависимости (cumulative). Если модуль дольше бюджета
+или не импортируется — код возврата 1, так что скрипт можно ставить в CI.
+
+Перед замером модули проекта компилируются в __pycache__ (как после установки),
+иначе при PYTHONDONTWRITEBYTECODE=1 в замер попадает компиляция исходников.
+Каждый модуль замеряется --repeat раз и берётся лучший прогон — шум планировщика
+на загруженной машине не должен валить CI.
+
+Быстрый запуск:
+  python startup_report.py                       # все модули, бюджет 150 мс (серверы — из BUDGETS)
+  python startup_report.py bot_core batch_qa --budget-ms 80 --top 5
+"""
+
+import re
+import sys
+import argparse
+import compileall
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+MODULES = ["curriculum", "bot_core", "health", "batch_qa", "api_server", "tg_bot", "scraper_itmo", "pdf_ingest"]
+BUDGET_MS = 150.0
+# серверам без своего HTTP-стека не стартовать — aiohttp (230–430 мс) и http.server
+# (~50–100 мс) входят в их бюджет; клиенты (tg_bot) импортируют health только в main()
+BUDGETS = {"api_server": 800.0, "health": 250.0}
+
+# import time:       self [us] |  cumulative | imported package
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+Entry = Tuple[str, float, float, int]  # (модуль, self мс, cumulative мс, глубина)
+
+def measure(module: str, cwd: Path) -> Tuple[Optional[List[Entry]], str]:
+    """Записи importtime для `import module` или (None, текст ошибки)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=cwd, capture_output=True, text=True)
+    entries: List[Entry] = []
+    other: List[str] = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append((m.group(4), int(m.group(1)) / 1000, int(m.group(2)) / 1000, len(m.group(3)) // 2))
+        elif not line.startswith("import time:"):
+            other.append(line)
+    if proc.returncode != 0:
+        return None, (other[-1] if other else f"exit code {proc.returncode}")
+    return entries, ""
+
+def breakdown(module: str, entries: List[Entry]) -> Tuple[float, List[Entry]]:
+    """
+    Cumulative самого модуля и его прямые зависимости. importtime печатает дерево
+    в обратном порядке (дети перед родителем), поэтому идём назад от строки модуля.
+    """
+    for i in range(len(entries) - 1, -1, -1):
+        if entries[i][0] == module and entries[i][3] == 0:
+            break
+    else:
+        return 0.0, []
+    deps = []
+    for j in range(i - 1, -1, -1):
+        if entries[j][3] == 0:
+            break
+        if entries[j][3] == 1:
+            deps.append(entries[j])
+    return entries[i][2], sorted(deps, key=lambda e: -e[2])
+
+def main():
+    ap = argparse.ArgumentParser(description="Время холодного импорта модулей (python -X importtime)")
+    ap.add_argument("modules", nargs="*", default=MODULES, help="Модули для замера")
+    ap.add_argument("--budget-ms", type=float, default=None,
+                    help=f"Бюджет на импорт одного модуля, мс (по умолчанию {BUDGET_MS:.0f}, для серверов — из BUDGETS)")
+    ap.add_argument("--top", type=int, default=8, help="Сколько самых дорогих зависимостей показать")
+    ap.add_argument("--repeat", type=int, default=3, help="Сколько раз замерять модуль (берётся лучший)")
+    args = ap.parse_args()
+
+    cwd = Path(__file__).resolve().parent
+    compileall.compile_dir(cwd, maxlevels=0, quiet=1)
+    over = []
+    for module in args.modules:
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            entries, err = measure(module, cwd)
+            if entries is None:
+                break
+            runs.append(breakdown(module, entries))
+        if not runs:
+            print(f"{module:<14} не импортируется: {err}")
+            over.append(module)
+            continue
+        budget = args.budget_ms or BUDGETS.get(module, BUDGET_MS)
+        total, deps = min(runs, key=lambda r: r[0])
+        flag = "ok" if total <= budget else "ПРЕВЫШЕН БЮДЖЕТ"
+        print(f"{module:<14} {total:>8.1f} мс / {budget:.0f}  [{flag}]")
+        for name, _, cum, _ in deps[:args.top]:
+            print(f"    {cum:>8.1f} мс  {name}")
+        if total > budget:
+            over.append(module)
+
+    if over:
+        print(f"\nБюджет превышен или модуль не импортируется: {', '.join(over)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+import api_server  # noqa: E402
+import bot_core  # noqa: E402
+
+
+@pytest.fixture
+def call(tmp_path, monkeypatch):
+    """call(coro_fn) — выполнить coro_fn(client) против свежего приложения."""
+    monkeypatch.setattr(api_server.usage, "directory", tmp_path)
+
+    def run(fn):
+        async def main():
+            async with TestClient(TestServer(api_server.make_app())) as client:
+                return await fn(client)
+        return asyncio.run(main())
+    return run
+
+
+def test_etag_revalidation(call):
+    async def fn(client):
+        r = await client.get("/api/programs")
+        etag = r.headers["ETag"]
+        again = await client.get("/api/programs", headers={"If-None-Match": etag})
+        stale = await client.get("/api/programs", headers={"If-None-Match": '"old"'})
+        return r.status, etag, again.status, await again.read(), stale.status
+    status, etag, again, body, stale = call(fn)
+    assert (status, again, body, stale) == (200, 304, b"", 200)
+    assert etag.startswith('"')
+
+
+def test_etag_changes_with_data_after_restart(call, monkeypatch):
+    async def fn(client):
+        return (await client.get("/api/programs")).headers["ETag"]
+    before = call(fn)
+    # рестарт с обновлёнными планами: новый процесс, store.version снова тот же
+    monkeypatch.setattr(bot_core.store, "list_programs", lambda: [("ai", "Новое название")])
+
+    async def revalidate(client):
+        r = await client.get("/api/programs", headers={"If-None-Match": before})
+        return r.status, r.headers["ETag"]
+    status, after = call(revalidate)
+    assert status == 200 and after != before
+
+
+@pytest.mark.parametrize("body", [{"tags": 5}, {"tags": ["ml", 1]}, {"program": ["ai"]},
+                                  {"program": "nope"}, {"text": 3}, [1, 2]])
+def test_ask_rejects_malformed_body(call, body):
+    async def fn(client):
+        r = await client.post("/api/ask", json=body)
+        return r.status, await r.json()
+    status, payload = call(fn)
+    assert status == 400 and "error" in payload
+
+
+@pytest.mark.parametrize("url, status", [("/api/ai/recommend?tags=ml&k=-2", 400),
+                                         ("/api/ai/recommend?tags=ml&k=0", 400),
+                                         ("/api/similar?q=python&k=0", 400),
+                                         ("/api/nope/practice", 404)])
+def test_get_rejects_bad_params(call, url, status):
+    async def fn(client):
+        return (await client.get(url)).status
+    assert call(fn) == status
@@ -0,0 +1,49 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from batch_qa import _answer, _records
+
+ROOT = Path(__file__).resolve().parent.parent
+BAD = ['5', '[1, 2]', 'null', 'не json',
+       '{"user_id": [1], "text": "программы"}',
+       '{"user_id": 1, "tags": 5, "text": "рекомендации"}',
+       '{"user_id": 1, "program": "nope", "text": "обязательные"}']
+
+
+def test_records_skip_non_objects(capsys):
+    recs = list(_records(io.StringIO("\n".join(['"программы"', *BAD[:4], '{"text": "помощь"}']))))
+    assert recs == [{"text": "программы"}, {"text": "помощь"}]
+    assert capsys.readouterr().err.count("пропускаю") == 4
+
+
+@pytest.mark.parametrize("rec, intent", [
+    ({"user_id": [1], "text": "программы"}, "programs"),
+    ({"user_id": 1, "tags": 5, "text": "рекомендации"}, "error"),
+    ({"user_id": 1, "tags": [5], "text": "рекомендации"}, "error"),
+    ({"user_id": 1, "program": "nope", "text": "обязательные"}, "error"),
+])
+def test_bad_record_becomes_a_row(rec, intent):
+    sessions = {}
+    assert _answer(sessions, rec)[0] == intent
+    assert list(sessions) == [str(rec["user_id"])]
+
+
+def test_unknown_program_keeps_session_program():
+    sessions = {}
+    _answer(sessions, {"user_id": 1, "program": "ai", "text": "помощь"})
+    _answer(sessions, {"user_id": 1, "program": "nope", "text": "помощь"})
+    assert sessions["1"].program == "ai"
+
+
+def test_malformed_input_does_not_hang_the_run():
+    lines = BAD + ['{"user_id": 2, "text": "программы"}']
+    proc = subprocess.run([sys.executable, "batch_qa.py", "-", "--workers", "2"], cwd=ROOT,
+                          input="\n".join(lines), capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    rows = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert sorted(r["intent"] for r in rows) == ["error", "error", "programs", "programs"]
@@ -0,0 +1,50 @@
+import pytest
+
+from bot_core import BotSession, rank_programs
+
+
+@pytest.mark.parametrize("tags, first", [(["ml", "nlp"], "ai"), (["product"], "ai_product")])
+def test_rank_programs_order(tags, first):
+    ranked = rank_programs(tags)
+    assert ranked[0]["program"] == first
+    assert {r["program"] for r in ranked} == {"ai", "ai_product"}
+    assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+
+
+def test_rank_programs_topics_and_credits():
+    for r in rank_programs(["ML", "nlp", "xyz"]):
+        # неизвестный тег не учитывается, регистр не важен
+        assert {t["tag"] for t in r["topics"]} <= {"ml", "nlp"}
+        assert r["credits"] == sum(t["credits"] for t in r["topics"])
+        assert [t["credits"] for t in r["topics"]] == sorted((t["credits"] for t in r["topics"]), reverse=True)
+    assert rank_programs(["xyz"]) == []
+
+
+def test_compare_with_unknown_tags_explains_how_to_fix():
+    s = BotSession()
+    s.tags = ["xyz"]
+    answer = s.handle("сравни программы")
+    assert s.last_intent == "compare" and s.last_hits == 0
+    assert answer.startswith("Сравнение строится по темам курсов") and "(xyz)" in answer
+
+
+def test_compare_names_the_best_program():
+    s = BotSession()
+    s.tags = ["ml", "nlp"]
+    answer = s.handle("какая программа подходит?")
+    assert s.last_intent == "compare" and s.last_hits == 2
+    assert answer.splitlines()[1].startswith("1. «Искусственный интеллект»")
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("теги: ml, подходите", "set_tags"),
+    ("похожие на: сравнение моделей", "similar"),
+    ("сравни программы", "compare"),
+    ("сравни ai и ai product", "compare"),
+    ("программы", "programs"),
+    ("что есть по стратегии", "programs"),
+])
+def test_compare_does_not_steal_other_intents(text, intent):
+    s = BotSession()
+    s.handle(text)
+    assert s.last_intent == intent
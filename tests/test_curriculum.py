@@ -0,0 +1,73 @@
+import json
+import os
+import stat
+
+from curriculum import atomic_write_text, diff_plans, iter_records, save_plan
+
+
+def plan(*groups):
+    """План в схеме ai: groups — (семестр, [(название, кредиты, часы), ...])."""
+    return {"curriculum": {"program_name": "Тест", "blocks": [{
+        "block_name": "Блок 1. Модули (дисциплины)",
+        "modules": [{"module_name": "Индивидуальная профессиональная подготовка", "semesters": [
+            {"semester_number": sem, "course_groups": [{"group_type": "Путь выбора дисциплин", "courses": [
+                {"title": t, "credits": cr, "hours": h} for t, cr, h in courses]}]}
+            for sem, courses in groups
+        ]}],
+    }]}}
+
+
+def test_diff_added_removed_changed():
+    old = plan((1, [("A", 3, 108), ("B", 3, 108)]))
+    new = plan((1, [("A", 6, 216), ("C", 3, 108)]))
+    ops = {(c["op"], c["title"]): c for c in diff_plans("ai", old, new)}
+    assert set(ops) == {("changed", "A"), ("removed", "B"), ("added", "C")}
+    assert ops[("changed", "A")]["fields"] == {"credits": [3, 6], "hours": [108, 216]}
+    assert ops[("added", "C")]["semester"] == "1"
+
+
+def test_diff_same_title_in_other_semester_is_another_course():
+    changes = diff_plans("ai", plan((1, [("A", 3, 108)])), plan((2, [("A", 3, 108)])))
+    assert sorted((c["op"], c["semester"]) for c in changes) == [("added", "2"), ("removed", "1")]
+
+
+def test_diff_duplicate_keys_compared_pairwise():
+    old = plan((1, [("A", 3, 108), ("A", 3, 108)]))
+    new = plan((1, [("A", 3, 108), ("A", 6, 108), ("A", 3, 108)]))
+    changes = diff_plans("ai", old, new)
+    assert [c["op"] for c in changes] == ["changed", "added"]
+    assert changes[0]["fields"] == {"credits": [3, 6]}
+
+
+def test_diff_unchanged_and_new_plan():
+    p = plan((1, [("A", 3, 108)]))
+    assert diff_plans("ai", p, json.loads(json.dumps(p))) == []
+    assert [c["op"] for c in diff_plans("ai", None, p)] == ["added"]
+
+
+def test_atomic_write_keeps_mode(tmp_path):
+    path = tmp_path / "ai_plan.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o644)
+    atomic_write_text(path, "{\"x\": 1}")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+    assert path.read_text(encoding="utf-8") == "{\"x\": 1}"
+    assert [p.name for p in tmp_path.iterdir()] == ["ai_plan.json"]
+
+
+def test_save_plan_writes_changelog_only_on_change(tmp_path):
+    p = plan((1, [("A", 3, 108)]))
+    assert save_plan(tmp_path, "ai", p, "t1")[0]["op"] == "added"
+    assert save_plan(tmp_path, "ai", p, "t2") == []
+    lines = (tmp_path / "changelog.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x)["ts"] for x in lines] == ["t1"]
+
+
+def test_semester_range_from_group_name():
+    data = {"blocks": [{"block_name": "Блок 1. Модули (дисциплины)", "modules": [{
+        "module_name": "Универсальная (надпрофессиональная) подготовка", "sub_modules": [
+            {"name": "Майнорский Soft Skills (1-3 семестры)", "courses": [{"title": "A", "credits": 3}]},
+            {"name": "Пул выбора 2 сем", "courses": [{"title": "B", "credits": 3}]},
+        ]}]}]}
+    sems = {r["title"]: r["semesters"] for r in iter_records("ai", data) if r["type"] == "course"}
+    assert sems == {"A": [1, 2, 3], "B": [2]}
@@ -0,0 +1,49 @@
+from pdf_ingest import build_tree, page_rows, to_ai_schema
+
+PAGE = {"tables": [[
+    ["Семестр", "Наименование", "з.е.", "час."],
+    [None, "Блок 1. Модули (дисциплины)", "6", "216"],
+    [None, "Индивидуальная профессиональная подготовка", "6", "216"],
+    [None, "Обязательные дисциплины. 1 семестр", "3", "108"],
+    ["1", "Машинное обучение", "3", "108"],
+    [None, "Пул выбора 2 сем", "3", "108"],
+    ["2", "Компьютерное зрение", "3", "108"],
+    ["2", "Обработка текстов", "3", "108"],
+    [None, "Универсальная (надпрофессиональная) подготовка", "3", "108"],
+    [None, "Микромодули Soft Skills (1-3 семестры)", "3", "108"],
+    ["1, 2, 3", "Элективные микромодули Soft Skills", "3", "108"],
+    [None, "Блок 4. Факультативные модули (дисциплины)", "0", "0"],
+    [None, "Элективные микромодули Soft Skills (1-3 семестры, онлайн)", "0", "0"],
+    ["1, 2, 3", "Эмоциональный интеллект", "1", "36"],
+    ["1, 2, 3", "Управление конфликтами", "1", "36"],
+    ["1, 2, 3", "Успешные переговоры", "1", "36"],
+    ["1, 2, 3", "Самопрезентация и нетворкинг", "1", "36"],
+]]}
+
+
+def test_page_rows_skips_header_and_normalizes_semester():
+    rows = page_rows(PAGE)
+    assert rows[0] == ("", "Блок 1. Модули (дисциплины)", 6, 216)
+    assert rows[-1] == ("1,2,3", "Самопрезентация и нетворкинг", 1, 36)
+    assert len(rows) == 16
+
+
+def test_page_rows_text_fallback():
+    rows = page_rows({"text": "Блок 2. Практика 6 216\n1 Проектная практика 6 216\nмусор"})
+    assert rows == [("", "Блок 2. Практика", 6, 216), ("1", "Проектная практика", 6, 216)]
+
+
+def test_build_tree_to_ai_schema():
+    blocks = build_tree(page_rows(PAGE))
+    assert [b["name"] for b in blocks] == ["Блок 1. Модули (дисциплины)", "Блок 4. Факультативные модули (дисциплины)"]
+    out = to_ai_schema("Тест", blocks)["curriculum"]
+    module = out["blocks"][0]["modules"][0]
+    assert [(s["semester_number"], [g["group_type"] for g in s["course_groups"]]) for s in module["semesters"]] == [
+        (1, ["Обязательные дисциплины"]), (2, ["Путь выбора дисциплин"])]
+    assert [c["title"] for c in module["semesters"][1]["course_groups"][0]["courses"]] == [
+        "Компьютерное зрение", "Обработка текстов"]
+    soft = out["blocks"][-1]
+    assert soft["block_name"] == "Майнорский факультет (Soft Skills)"
+    # итог — из строки группы в универсальной подготовке, каталог в факультативах идёт с 0 з.е.
+    assert (soft["total_credits"], soft["total_hours"]) == (3, 108)
+    assert len(soft["courses"]) == 4
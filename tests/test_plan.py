@@ -0,0 +1,43 @@
+import bot_core
+from bot_core import _knapsack, build_study_plan
+
+
+def test_knapsack_exact_fill():
+    items = [(6, 0), (3, 0), (5, 0), (4, 0)]
+    chosen = _knapsack(items, 12)
+    assert sum(items[i][0] for i in chosen) == 12
+
+
+def test_knapsack_prefers_credits_then_value():
+    # 9 кредитов набираются двумя способами — берём тот, где ценность выше
+    items = [(6, 1), (3, 0), (3, 2), (6, 0)]
+    assert _knapsack(items, 9) == [0, 2]
+    # ценность не важнее заполнения бюджета: 5+4 лучше, чем одна ценная 6
+    items = [(6, 10), (5, 0), (4, 0)]
+    assert _knapsack(items, 9) == [1, 2]
+
+
+def test_knapsack_nothing_fits():
+    assert _knapsack([(6, 1), (9, 5)], 3) == []
+
+
+def test_mandatory_groups_taken_whole():
+    for pid in bot_core.PLAN_PATHS:
+        plan = build_study_plan(pid, ["ml", "nlp"])
+        mandatory = {(c["semesters"][0], c["group"], c["title"]) for c in bot_core.store.courses(pid)
+                     if c["kind"] == "mandatory" and len(c["semesters"]) == 1 and c.get("credits")}
+        shown = {(s["semester"], g["group"], c["title"])
+                 for s in plan["semesters"] for g in s["groups"] for c in g["courses"]}
+        assert mandatory <= shown
+        for s in plan["semesters"]:
+            for g in s["groups"]:
+                if g["over_budget"]:
+                    assert not g["elective"] and g["credits"] > g["budget"]
+
+
+def test_elective_groups_stay_within_budget():
+    plan = build_study_plan("ai", ["ml"])
+    for s in plan["semesters"]:
+        for g in s["groups"]:
+            if g["elective"]:
+                assert g["credits"] <= g["budget"]
@@ -0,0 +1,26 @@
+import pytest
+
+from bot_core import BotSession, similar_courses
+
+
+@pytest.mark.parametrize("text", ["похожие на: глубокое обучение", "похожие на глубокое обучение",
+                                  "похожие курсы на: глубокое обучение", "аналогичные курсы: глубокое обучение",
+                                  "      Похожие на: Глубокое обучение"])
+def test_similar_forms(text):
+    s = BotSession()
+    answer = s.handle(text)
+    assert s.last_intent == "similar" and s.last_hits
+    assert answer.startswith("Похожие на «Глубокое обучение")
+
+
+def test_unknown_course_is_a_miss():
+    s = BotSession()
+    assert s.handle("похожие на: xyzxyz").startswith("Не нашёл")
+    assert s.last_hits == 0
+    assert similar_courses("на: xyz") == (None, [])
+
+
+def test_trigger_word_alone_is_not_similar():
+    s = BotSession()
+    s.handle("что подобное есть")
+    assert s.last_intent != "similar"
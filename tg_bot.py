@@ -1,23 +1,17 @@
 # tg_bot.py
+from __future__ import annotations
 import os
+import time
 import logging
-from dotenv import load_dotenv
-from telegram import Update
-from telegram.ext import (
-    ApplicationBuilder,
-    CommandHandler,
-    MessageHandler,
-    ContextTypes,
-    filters,
-)
-from bot_core import BotSession, program_title
+from typing import TYPE_CHECKING
+from bot_core import BotSession, program_title, warmup
+from usage_log import log_answer
 
-logging.basicConfig(level=logging.INFO)
-load_dotenv()
+if TYPE_CHECKING:  # python-telegram-bot импортируем в main(): модуль можно грузить без него
+    from telegram import Update
+    from telegram.ext import ContextTypes
 
-TOKEN = os.getenv("TELEGRAM_TOKEN")
-if not TOKEN:
-    raise RuntimeError("Переменная окружения TELEGRAM_TOKEN не задана")
+logging.basicConfig(level=logging.INFO)
 
 # Сессии на пользователя (каждому — свой BotSession)
 SESSIONS = {}
@@ -28,6 +22,14 @@ def session_for(update: Update) -> BotSession:
         SESSIONS[uid] = BotSession()
     return SESSIONS[uid]
 
+def ask(update: Update, s: BotSession, text: str) -> str:
+    """s.handle + событие в журнал использования (пишется в фоне, ответ не задерживает)."""
+    t0 = time.perf_counter()
+    answer = s.handle(text)
+    uid = update.effective_user.id if update.effective_user else 0
+    log_answer("tg", uid, s, text, (time.perf_counter() - t0) * 1000)
+    return answer
+
 INTRO = (
     "👋 Привет! Я помогу выбрать программу и спланировать учёбу.\n"
     "Выбери программу: /ai или /aiproduct\n"
@@ -35,10 +37,12 @@ INTRO = (
     "Примеры:\n"
     "• теги: ml, nlp, python, sys\n"
     "• рекомендации 2 семестр\n"
+    "• /plan — собрать элективы на все семестры под кредиты\n"
     "• обязательные дисциплины 1 семестр\n"
     "• выборные 2 семестр\n"
     "• практика / гиа / soft skills\n"
     "• найди курс: глубокое обучение\n"
+    "• /similar глубокое обучение — похожие курсы\n"
     "• сравни программы\n"
 )
 
@@ -50,7 +54,7 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def programs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     s = session_for(update)
-    ans = s.handle("программы")
+    ans = ask(update, s, "программы")
     await update.message.reply_text(ans)
 
 async def set_ai(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -65,7 +69,7 @@ async def set_ai_product(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def compare(update: Update, context: ContextTypes.DEFAULT_TYPE):
     s = session_for(update)
-    await update.message.reply_text(s.handle("сравни программы"))
+    await update.message.reply_text(ask(update, s, "сравни программы"))
 
 async def recommend(update: Update, context: ContextTypes.DEFAULT_TYPE):
     s = session_for(update)
@@ -75,7 +79,20 @@ async def recommend(update: Update, context: ContextTypes.DEFAULT_TYPE):
         text = f"рекомендации {text} семестр"
     else:
         text = "рекомендации " + text
-    await update.message.reply_text(s.handle(text))
+    await update.message.reply_text(ask(update, s, text))
+
+async def similar(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    s = session_for(update)
+    # пример: /similar глубокое обучение
+    raw = " ".join(context.args) if context.args else ""
+    if not raw:
+        await update.message.reply_text("Напиши название курса. Пример: /similar глубокое обучение")
+        return
+    await update.message.reply_text(ask(update, s, f"похожие на: {raw}"))
+
+async def plan(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    s = session_for(update)
+    await update.message.reply_text(ask(update, s, "собери план"))
 
 async def set_tags(update: Update, context: ContextTypes.DEFAULT_TYPE):
     s = session_for(update)
@@ -84,13 +101,13 @@ async def set_tags(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not raw:
         await update.message.reply_text("Напиши теги через пробел или запятую. Пример: /tags ml nlp python")
         return
-    await update.message.reply_text(s.handle(f"теги: {raw}"))
+    await update.message.reply_text(ask(update, s, f"теги: {raw}"))
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     s = session_for(update)
     text = update.message.text or ""
     try:
-        answer = s.handle(text)
+        answer = ask(update, s, text)
     except Exception as e:
         logging.exception("TG error")
         answer = f"Упс, что-то пошло не так: {e}\nПопробуй ещё раз или напиши /help"
@@ -99,8 +116,33 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE):
     logging.exception("Unhandled error: %s", context.error)
 
+async def on_ready(app):
+    from health import state as health
+
+    # бот инициализирован (токен проверен) — можно принимать трафик
+    health.set_ready(warmup_ms=app.bot_data.get("warmup_ms", {}))
+    logging.info("Ready")
+
 def main():
-    app = ApplicationBuilder().token(TOKEN).build()
+    from dotenv import load_dotenv
+    from telegram import Update
+    from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters
+    from health import start_health_server
+    from usage_log import log as usage
+
+    load_dotenv()
+    token = os.getenv("TELEGRAM_TOKEN")
+    if not token:
+        raise RuntimeError("Переменная окружения TELEGRAM_TOKEN не задана")
+
+    # пробы поднимаем сразу: /healthz отвечает, /readyz — 503 до конца прогрева
+    start_health_server()
+    usage.start()
+    warmup_ms = warmup()
+    logging.info("Warm-up done: %s", warmup_ms)
+
+    app = ApplicationBuilder().token(token).post_init(on_ready).build()
+    app.bot_data["warmup_ms"] = warmup_ms
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("help", help_cmd))
@@ -110,11 +152,14 @@ def main():
     app.add_handler(CommandHandler("compare", compare))
     app.add_handler(CommandHandler("recommend", recommend))
     app.add_handler(CommandHandler("tags", set_tags))
+    app.add_handler(CommandHandler("similar", similar))
+    app.add_handler(CommandHandler("plan", plan))
 
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     app.add_error_handler(on_error)
 
     app.run_polling(allowed_updates=Update.ALL_TYPES)
+    usage.close()
 
 if __name__ == "__main__":
     main()
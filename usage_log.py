@@ -0,0 +1,231 @@
+# usage_log.py
+"""
+Журнал использования бота (write-behind): какие интенты, теги и запросы приходят
+и сколько результатов находим. Только stdlib.
+
+Обработчик кладёт компактное событие в кольцевой буфер в памяти (dict + append под
+локом — без I/O на горячем пути), фоновый поток раз в FLUSH_EVERY секунд (или когда
+накопился BATCH) пишет пачку в data/usage/events-*.jsonl.gz. Каждая пачка — отдельный
+gzip-член, так что падение процесса теряет максимум неслитый буфер, а не файл.
+Файлы ротируются по размеру, старше KEEP_FILES удаляются. Если писатель не успевает,
+буфер вытесняет самые старые события и считает их в dropped; счётчики
+(emitted/dropped/written/failed) пишутся событием {"ev": "stats"} при закрытии.
+
+Отчёт по накопленным файлам:
+  python usage_log.py --dir data/usage --top 20
+"""
+from __future__ import annotations
+import argparse
+import atexit
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+USAGE_DIR = Path(os.getenv("USAGE_LOG_DIR", "data/usage"))
+CAPACITY = 10000              # событий в буфере; дальше вытесняются самые старые
+BATCH = 1000                  # столько событий будят писателя раньше таймера
+FLUSH_EVERY = 2.0             # секунд между сбросами
+ROTATE_BYTES = 8 * 1024 * 1024  # размер файла (сжатого), после которого начинаем новый
+KEEP_FILES = 50
+MAX_TEXT = 200                # обрезаем текст запроса — событие остаётся компактным
+
+# интенты, у которых «0 результатов» означает промах поиска/индекса
+SEARCH_INTENTS = ("search_course", "similar", "recommend", "build_plan", "compare",
+                  "mandatory", "selective", "practice", "gia", "soft")
+
+class EventLog:
+    def __init__(self, directory: Path = USAGE_DIR, capacity: int = CAPACITY, batch: int = BATCH,
+                 flush_every: float = FLUSH_EVERY, rotate_bytes: int = ROTATE_BYTES, keep_files: int = KEEP_FILES):
+        self.directory = Path(directory)
+        self.batch = batch
+        self.flush_every = flush_every
+        self.rotate_bytes = rotate_bytes
+        self.keep_files = keep_files
+        self._buf: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._path: Optional[Path] = None
+        self._seq = 0
+        self.emitted = self.dropped = self.written = self.failed = 0
+
+    # ---------- горячий путь ----------
+    def emit(self, ev: str, **fields: Any):
+        """Положить событие в буфер. Пока журнал не запущен — ничего не делает."""
+        if self._thread is None:
+            return
+        fields["ev"] = ev
+        fields["ts"] = round(time.time(), 3)
+        with self._lock:
+            if len(self._buf) == self._buf.maxlen:
+                self.dropped += 1
+            self._buf.append(fields)
+            self.emitted += 1
+            full = len(self._buf) >= self.batch
+        if full:
+            self._wake.set()
+
+    # ---------- жизненный цикл ----------
+    def start(self) -> "EventLog":
+        if self._thread is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="usage-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self):
+        """Слить буфер, записать счётчики и остановить поток."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop = True
+        self._wake.set()
+        thread.join()
+        self._thread = None
+        self._flush()  # то, что успели положить, пока поток завершался
+        self._write([{"ev": "stats", "ts": round(time.time(), 3), **self.stats()}])
+
+    def stats(self) -> Dict[str, int]:
+        return {"emitted": self.emitted, "dropped": self.dropped, "written": self.written,
+                "failed": self.failed, "buffered": len(self._buf)}
+
+    # ---------- фоновый писатель ----------
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_every)
+            self._wake.clear()
+            self._flush()
+            if self._stop:
+                return
+
+    def _flush(self):
+        with self._lock:
+            if not self._buf:
+                return
+            events = list(self._buf)
+            self._buf.clear()
+        self._write(events)
+
+    def _write(self, events: List[Dict[str, Any]]):
+        data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in events)
+        try:
+            path = self._current_path()
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(data)
+            self.written += len(events)
+        except OSError:
+            # аналитика не должна ронять бота — теряем пачку и считаем её
+            self.failed += len(events)
+
+    def _current_path(self) -> Path:
+        if self._path is None or not self._path.exists() or self._path.stat().st_size >= self.rotate_bytes:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._seq += 1
+            self._path = self.directory / f"events-{stamp}-{os.getpid()}-{self._seq}.jsonl.gz"
+            self._prune()
+        return self._path
+
+    def _prune(self):
+        files = sorted(self.directory.glob("events-*.jsonl.gz"), key=lambda p: p.stat().st_mtime)
+        for old in files[:max(0, len(files) - self.keep_files + 1)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+log = EventLog()
+
+# Ключ HMAC для псевдонимов. Без USAGE_LOG_SECRET берётся случайный на процесс:
+# id Телеграма перебираются, так что простой хэш (crc32/sha) легко обратить.
+# С секретом псевдонимы стабильны между рестартами и файлами журнала.
+_SECRET = os.getenv("USAGE_LOG_SECRET", "").encode() or os.urandom(32)
+
+def user_key(uid: Any) -> str:
+    """Псевдоним пользователя (HMAC-SHA256 с секретом): в журнал не пишем сырые id."""
+    return hmac.new(_SECRET, str(uid).encode(), hashlib.sha256).hexdigest()[:16]
+
+def log_answer(src: str, uid: Any, session: Any, text: str, ms: float):
+    """Событие «вопрос — ответ» по состоянию BotSession после handle()."""
+    log.emit("ask", src=src, user=user_key(uid), program=session.program, intent=session.last_intent,
+             hits=session.last_hits, tags=list(session.tags), q=(text or "")[:MAX_TEXT], ms=round(ms, 2))
+
+# ---------- Офлайн-отчёт ----------
+
+def read_events(directory: Path) -> Iterator[Dict[str, Any]]:
+    for path in sorted(Path(directory).glob("events-*.jsonl.gz")):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except (OSError, EOFError, ValueError):
+            # хвост файла мог оборваться при падении процесса — берём, что успели прочитать
+            continue
+
+def _norm_query(q: str) -> str:
+    return " ".join((q or "").lower().split())
+
+def aggregate(events: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    intents: Dict[str, List[float]] = {}
+    queries: Counter = Counter()
+    zero: Counter = Counter()
+    tags: Counter = Counter()
+    programs: Counter = Counter()
+    log_stats: Counter = Counter()
+    for e in events:
+        if e.get("ev") == "stats":
+            log_stats.update({k: e.get(k, 0) for k in ("emitted", "dropped", "written", "failed")})
+            continue
+        if e.get("ev") != "ask":
+            continue
+        intent = e.get("intent") or "?"
+        intents.setdefault(intent, []).append(e.get("ms") or 0.0)
+        q = _norm_query(e.get("q", ""))
+        queries[q] += 1
+        if intent in SEARCH_INTENTS and e.get("hits") == 0:
+            zero[(intent, q)] += 1
+        tags.update(e.get("tags") or [])
+        programs[e.get("program")] += 1
+    return {"intents": intents, "queries": queries, "zero": zero, "tags": tags,
+            "programs": programs, "log_stats": log_stats}
+
+def report(agg: Dict[str, Any], top: int = 20):
+    intents = agg["intents"]
+    total = sum(len(v) for v in intents.values())
+    print(f"Событий: {total}")
+    if agg["log_stats"]:
+        st = agg["log_stats"]
+        print(f"Журнал: записано {st['written']}, вытеснено из буфера {st['dropped']}, ошибок записи {st['failed']}")
+    print(f"\n{'интент':<16}{'кол-во':>9}{'доля':>8}{'ср., мс':>10}{'p95':>9}")
+    for intent, ms in sorted(intents.items(), key=lambda x: -len(x[1])):
+        ms.sort()
+        p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+        print(f"{intent:<16}{len(ms):>9}{len(ms) / max(total, 1):>8.1%}{sum(ms) / len(ms):>10.3f}{p95:>9.3f}")
+    print("\nЧастые запросы:")
+    for q, n in agg["queries"].most_common(top):
+        print(f"{n:>7}  {q}")
+    print("\nЗапросы без результатов:")
+    for (intent, q), n in agg["zero"].most_common(top):
+        print(f"{n:>7}  [{intent}] {q}")
+    print("\nТеги:", ", ".join(f"{t} {n}" for t, n in agg["tags"].most_common(top)) or "—")
+    print("Программы:", ", ".join(f"{p} {n}" for p, n in agg["programs"].most_common()) or "—")
+
+def main():
+    ap = argparse.ArgumentParser(description="Отчёт по журналу использования бота")
+    ap.add_argument("--dir", type=Path, default=USAGE_DIR, help="Папка с events-*.jsonl.gz")
+    ap.add_argument("--top", type=int, default=20, help="Сколько строк в топах")
+    args = ap.parse_args()
+    report(aggregate(read_events(args.dir)), top=args.top)
+
+if __name__ == "__main__":
+    main()